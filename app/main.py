@@ -1,5 +1,11 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from prometheus_fastapi_instrumentator import Instrumentator
 from dotenv import load_dotenv
+from app.utils.responses import OrjsonResponse
 from app.routes.api.notion_sync import router as notion_sync_router
 from app.routes.api.travel_times import router as travel_times_router
 from app.routes.api.task_split import router as task_split_router
@@ -12,7 +18,34 @@ from app.routes.api.shuttle_timeline import router as shuttle_timeline_router
 
 load_dotenv()
 
-app = FastAPI()
+SOLVER_POOL_WORKERS = int(os.getenv("SOLVER_POOL_WORKERS", "0")) or os.cpu_count()
+# The server is multi-threaded (threadpool, httpx, Playwright): forking it can leave a child
+# holding a copied lock forever, so solver processes start from a clean forkserver instead
+SOLVER_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    The shared headless browser is started lazily by the first scrape; close it here if it was.
+    OR-Tools solves run in a process pool so they use every core and leave the event loop free.
+    """
+    app.state.playwright = None
+    app.state.browser = None
+    app.state.solver_pool = ProcessPoolExecutor(
+        max_workers=SOLVER_POOL_WORKERS,
+        mp_context=multiprocessing.get_context(SOLVER_START_METHOD),
+    )
+    yield
+    app.state.solver_pool.shutdown(wait=False, cancel_futures=True)
+    if app.state.browser is not None:
+        await app.state.browser.close()
+    if app.state.playwright is not None:
+        await app.state.playwright.stop()
+
+app = FastAPI(lifespan=lifespan, default_response_class=OrjsonResponse)
+
+# Request metrics plus the Notion client histograms, served at /metrics
+Instrumentator().instrument(app).expose(app)
 
 @app.get("/")
 def read_root():
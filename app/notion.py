@@ -1,23 +1,90 @@
-from notion_client import Client
 from functools import lru_cache
 import os
+import asyncio
+import time
+import httpx
+from prometheus_client import Counter, Histogram
+from typing import AsyncIterator
 from dotenv import load_dotenv
+from app.utils.ratelimit import NOTION_LIMITER, backoff_delay
 
 load_dotenv()
 
-@lru_cache(maxsize=1)
-def get_notion_client() -> Client:
-    """Return a cached Notion client instance."""
+NOTION_API_URL = "https://api.notion.com/v1"
+NOTION_VERSION = os.getenv("NOTION_VERSION", "2025-09-03")
+NOTION_HTTP_TIMEOUT = float(os.getenv("NOTION_HTTP_TIMEOUT_SECONDS", "30"))
+NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "5"))
+
+# Notion typically answers in 200-800 ms
+NOTION_LATENCY = Histogram(
+    "notion_request_seconds",
+    "Latency of Notion API requests",
+    ["operation"],
+    buckets=[0.05, 0.1, 0.2, 0.5, 1, 2, 5],
+)
+NOTION_CALLS = Counter(
+    "notion_requests_total",
+    "Notion API requests by outcome",
+    ["operation", "outcome"],
+)
+
+def _get_notion_token() -> str:
     notion_token = os.getenv("NOTION_TOKEN")
     if not notion_token:
         raise RuntimeError("Environment variable NOTION_TOKEN is not set.")
-    return Client(auth=notion_token)
-
-def query_database(data_source_id: str) -> dict:
-    """Fetch all rows (pages) from a Notion database."""
-    notion = get_notion_client()
-    try:
-        results = notion.data_sources.query(data_source_id=data_source_id)
-        return results
-    except Exception as e:
-        raise RuntimeError(f"Failed to query Notion data source {data_source_id}: {str(e)}")
+    return notion_token
+
+@lru_cache(maxsize=1)
+def get_notion_http_client() -> httpx.AsyncClient:
+    """Return a cached async HTTP client bound to the Notion REST API."""
+    return httpx.AsyncClient(
+        base_url=NOTION_API_URL,
+        headers={
+            "Authorization": f"Bearer {_get_notion_token()}",
+            "Notion-Version": NOTION_VERSION,
+            "Content-Type": "application/json",
+        },
+        timeout=NOTION_HTTP_TIMEOUT,
+    )
+
+async def _post(path: str, body: dict, operation: str) -> dict:
+    """POST to the Notion API within the rate limit, retrying 429 responses."""
+    client = get_notion_http_client()
+    for attempt in range(NOTION_MAX_RETRIES + 1):
+        async with NOTION_LIMITER:
+            start = time.perf_counter()
+            try:
+                resp = await client.post(path, json=body)
+            except httpx.HTTPError:
+                NOTION_CALLS.labels(operation, "transport_error").inc()
+                raise
+            finally:
+                NOTION_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+        if resp.status_code == 429:
+            NOTION_CALLS.labels(operation, "rate_limited").inc()
+        elif resp.is_error:
+            NOTION_CALLS.labels(operation, "error").inc()
+        else:
+            NOTION_CALLS.labels(operation, "ok").inc()
+
+        if resp.status_code != 429 or attempt == NOTION_MAX_RETRIES:
+            resp.raise_for_status()
+            return resp.json()
+        await asyncio.sleep(backoff_delay(resp.headers.get("Retry-After"), attempt))
+
+async def query_database(data_source_id: str, page_size: int = 100) -> AsyncIterator[dict]:
+    """Yield every row (page) of a Notion data source, following the pagination cursor."""
+    body: dict = {"page_size": page_size}
+    while True:
+        try:
+            resp = await _post(f"/data_sources/{data_source_id}/query", body, "query")
+        except Exception as e:
+            raise RuntimeError(f"Failed to query Notion data source {data_source_id}: {str(e)}")
+
+        for row in resp.get("results", []):
+            yield row
+
+        if not resp.get("has_more"):
+            break
+        body["start_cursor"] = resp["next_cursor"]
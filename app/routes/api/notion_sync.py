@@ -1,6 +1,10 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
-from app.services.notion_sync_service import upsert_vehicle, upsert_depot, upsert_user
+from pydantic import BaseModel, ConfigDict, Field
+from app.services.notion_sync_service import (
+    upsert_vehicle, upsert_vehicles, upsert_depot, upsert_depots, upsert_user, upsert_users,
+)
+from app.utils.response_cache import drop_cached, ORTOOLS_PAYLOAD
 
 router = APIRouter()
 
@@ -8,6 +12,8 @@ router = APIRouter()
 # VEHICLE SYNC
 # ===============================
 class VehicleSyncPayload(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     vehicle_name: str = Field(..., description="Vehicle name from Notion")
     facility_relation_id: str | None = Field(None, description="Notion relation ID for related depot")
     seats: int | None = Field(None, description="Vehicle seat capacity")
@@ -21,7 +27,22 @@ async def sync_vehicles(payload: VehicleSyncPayload):
     Sync vehicle data into the database.
     """
     try:
-        result = upsert_vehicle(payload.model_dump())
+        result = await asyncio.to_thread(upsert_vehicle, payload)
+        drop_cached(ORTOOLS_PAYLOAD)
+        return result
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+@router.post("/vehicles/bulk")
+async def sync_vehicles_bulk(payloads: list[VehicleSyncPayload]):
+    """
+    Sync many vehicles in one call (chunked bulk upserts).
+    """
+    try:
+        result = await asyncio.to_thread(upsert_vehicles, payloads)
+        drop_cached(ORTOOLS_PAYLOAD)
         return result
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
@@ -32,6 +53,8 @@ async def sync_vehicles(payload: VehicleSyncPayload):
 # DEPOT SYNC
 # ===============================
 class DepotSyncPayload(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     depot_name: str = Field(..., description="Facility/Depot name from Notion")
     active: bool | None = Field(True, description="Active status")
     notion_page_id: str = Field(..., description="Notion page ID")
@@ -43,7 +66,22 @@ async def sync_depots(payload: DepotSyncPayload):
     Sync facility (depot) data into the database.
     """
     try:
-        result = upsert_depot(payload.model_dump())
+        result = await asyncio.to_thread(upsert_depot, payload)
+        drop_cached(ORTOOLS_PAYLOAD)
+        return result
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+@router.post("/depots/bulk")
+async def sync_depots_bulk(payloads: list[DepotSyncPayload]):
+    """
+    Sync many facilities (depots) in one call (chunked bulk upserts).
+    """
+    try:
+        result = await asyncio.to_thread(upsert_depots, payloads)
+        drop_cached(ORTOOLS_PAYLOAD)
         return result
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
@@ -54,6 +92,8 @@ async def sync_depots(payload: DepotSyncPayload):
 # USER SYNC
 # ===============================
 class UserSyncPayload(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     user_name: str = Field(..., description="User name from Notion")
     facility_relation_id: str | None = Field(None, description="Notion relation ID for related depot")
     active: bool | None = Field(True, description="Active status")
@@ -66,7 +106,20 @@ async def sync_users(payload: UserSyncPayload):
     Sync user data into the database.
     """
     try:
-        result = upsert_user(payload.model_dump())
+        result = await asyncio.to_thread(upsert_user, payload)
+        return result
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+@router.post("/users/bulk")
+async def sync_users_bulk(payloads: list[UserSyncPayload]):
+    """
+    Sync many users in one call (chunked bulk upserts).
+    """
+    try:
+        result = await asyncio.to_thread(upsert_users, payloads)
         return result
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
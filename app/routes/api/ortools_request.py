@@ -1,9 +1,34 @@
+import orjson
 from fastapi import APIRouter
+from fastapi.responses import Response
 from app.services.ortools_request_service import build_ortools_payload
+from app.utils.response_cache import cache_generation, get_cached, set_cached, ORTOOLS_PAYLOAD
+from app.utils.responses import OrjsonResponse
+from app.utils.singleflight import single_flight
 
 router = APIRouter()
 
+async def _build(run_id: int) -> tuple[dict, bytes | None]:
+    """Build the payload and, when ok, encode and cache it; returns (result, encoded body)."""
+    # A notion/task-split drop during the build leaves this body uncached
+    generation = cache_generation(ORTOOLS_PAYLOAD)
+    result = await build_ortools_payload(run_id)
+    if result.get("status") != "ok":
+        return result, None
+
+    body = orjson.dumps(result)
+    set_cached(ORTOOLS_PAYLOAD, run_id, body, generation=generation)
+    return result, body
+
 @router.post("/build")
 async def build_ortools(run_id: int):
     """Return OR-Tools formatted payload."""
-    return build_ortools_payload(run_id)
+    # The payload (NxN matrix included) is cached already encoded, so hits skip serialization
+    cached = get_cached(ORTOOLS_PAYLOAD, run_id)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    result, body = await single_flight(ORTOOLS_PAYLOAD, run_id, lambda: _build(run_id))
+    if body is None:
+        return OrjsonResponse(result)
+    return Response(content=body, media_type="application/json")
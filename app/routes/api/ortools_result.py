@@ -1,25 +1,47 @@
+import asyncio
 import logging
-from fastapi import APIRouter, Request
+from fastapi import APIRouter
+from pydantic import BaseModel, ConfigDict
 from app.services.ortools_result_service import process_ortools_result
+from app.utils.response_cache import drop_cached, SHUTTLE_TIMELINE
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# ===============================
+# RESULT PAYLOAD (solver output, relayed by Make)
+# ===============================
+class RouteStop(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    sequence: int | None = None
+    event_type: str | None = None
+    task_id: int | None = None
+    arrival_at: int | None = None
+    departure_at: int | None = None
+    passengers: int = 0
+
+class RouteItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    vehicle_id: int | None = None
+    stops: list[RouteStop] = []
+
+class OrtoolsResultPayload(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    run_id: int
+    routes: list[RouteItem] = []
+
 @router.post("/result")
-async def receive_ortools_result(request: Request):
+async def receive_ortools_result(payload: OrtoolsResultPayload):
     """
     Receive OR-Tools solver output and store routing results.
     """
-    try:
-        payload = await request.json()
-    except Exception as e:
-        logger.error(f"Invalid JSON received: {e}")
-        return {
-            "status": "error",
-            "message": "Invalid JSON payload"
-        }
-
     logger.info("Received OR-Tools result payload")
 
-    return process_ortools_result(payload)
+    # exclude_unset: fields the solver didn't send stay absent (no null keys in meta_json's extra fields)
+    result = await asyncio.to_thread(process_ortools_result, payload.model_dump(exclude_unset=True))
+    drop_cached(SHUTTLE_TIMELINE, key=payload.run_id)
+    return result
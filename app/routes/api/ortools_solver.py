@@ -1,22 +1,34 @@
-from fastapi import APIRouter
+import asyncio
+from concurrent.futures import Executor
+from fastapi import APIRouter, Request
 from app.services.ortools_request_service import build_ortools_payload
-from app.services.ortools_solver_service import (solve_ortools, post_solver_result_to_make)
+from app.utils.response_cache import ORTOOLS_SOLVE
+from app.utils.singleflight import single_flight
 
 router = APIRouter()
 
-@router.post("/solve")
-def solve_by_run_id(run_id: int):
-    built = build_ortools_payload(run_id)
+async def _solve(run_id: int, pool: Executor) -> dict:
+    # OR-Tools is heavy to import; load it on the first solve rather than at startup
+    from app.services.ortools_solver_service import solve_ortools, post_solver_result_to_make
+
+    built = await build_ortools_payload(run_id)
     if built.get("status") != "ok":
         return built
 
     payload = built["payload"]
-    result = solve_ortools(payload, run_id=run_id)
+    # OR-Tools is CPU-bound and holds the GIL; solve in a separate process
+    result = await asyncio.get_running_loop().run_in_executor(pool, solve_ortools, payload, run_id)
 
     if result.get("status") == "ok":
         try:
-            post_solver_result_to_make(result)
+            await asyncio.to_thread(post_solver_result_to_make, result)
         except Exception as e:
             result["make_webhook_warning"] = str(e)
 
     return result
+
+@router.post("/solve")
+async def solve_by_run_id(run_id: int, request: Request):
+    # Make.com retries and double clicks share one solve per run_id
+    pool = request.app.state.solver_pool
+    return await single_flight(ORTOOLS_SOLVE, run_id, lambda: _solve(run_id, pool))
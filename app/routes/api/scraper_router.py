@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, FastAPI, HTTPException, Request
 from pydantic import BaseModel
-import os
-import subprocess
 
 router = APIRouter()
 
+_browser_lock = asyncio.Lock()
+
 
 class HugScrapeRequest(BaseModel):
     SCRAPE_FACILITY: str
@@ -13,42 +14,73 @@ class HugScrapeRequest(BaseModel):
     SCRAPE_DAY: int
 
 
+class HugScrapeBatchRequest(BaseModel):
+    targets: list[HugScrapeRequest]
+
+
+async def _get_browser(app: FastAPI):
+    """
+    Start Playwright and the shared browser on first use; lifespan closes them on shutdown.
+    A browser that has crashed or disconnected is relaunched instead of failing every later scrape.
+    """
+    async with _browser_lock:
+        browser = app.state.browser
+        if browser is None or not browser.is_connected():
+            # Playwright is heavy to import; keep it out of app startup
+            from playwright.async_api import async_playwright
+            from app.services.hug_scraper import launch_browser
+
+            if app.state.playwright is None:
+                app.state.playwright = await async_playwright().start()
+            app.state.browser = await launch_browser(app.state.playwright)
+    return app.state.browser
+
+
 @router.post("/hug-scraper/run")
-def run_hug_scraper(req: HugScrapeRequest):
+async def run_hug_scraper(req: HugScrapeRequest, request: Request):
     """
     Trigger the HUG scraper from Make.com.
-    Sets environment variables dynamically and runs hug_scraper.py
+    Runs the scraper on the app's shared browser and returns the optimization_run id.
     """
-
-    # Set env vars for scraper
-    os.environ["SCRAPE_FACILITY"] = req.SCRAPE_FACILITY
-    os.environ["SCRAPE_YEAR"] = str(req.SCRAPE_YEAR)
-    os.environ["SCRAPE_MONTH"] = str(req.SCRAPE_MONTH)
-    os.environ["SCRAPE_DAY"] = str(req.SCRAPE_DAY)
+    from app.services.hug_scraper import main as run_scraper
 
     try:
-        # Run scraper
-        result = subprocess.run(
-            ["python", "-m", "app.services.hug_scraper"],
-            capture_output=True,
-            text=True
+        browser = await _get_browser(request.app)
+        optimization_run_id = await run_scraper(
+            browser,
+            req.SCRAPE_FACILITY,
+            req.SCRAPE_YEAR,
+            req.SCRAPE_MONTH,
+            req.SCRAPE_DAY,
         )
 
-        stdout = result.stdout or ""
-        stderr = result.stderr or ""
+        return {
+            "status": "ok",
+            "optimization_run_id": optimization_run_id,
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # 🔍 Extract optimization_run_id from stdout
-        optimization_run_id = None
-        for line in stdout.splitlines():
-            if line.startswith("__RUN_ID__="):
-                optimization_run_id = int(line.split("=", 1)[1])
-                break
+
+@router.post("/hug-scraper/run-batch")
+async def run_hug_scraper_batch(req: HugScrapeBatchRequest, request: Request):
+    """
+    Scrape several facility/date targets in one logged-in browser session.
+    Returns the optimization_run ids in the same order as the targets.
+    """
+    from app.services.hug_scraper import run_batch
+
+    try:
+        browser = await _get_browser(request.app)
+        optimization_run_ids = await run_batch(browser, [
+            (t.SCRAPE_FACILITY, t.SCRAPE_YEAR, t.SCRAPE_MONTH, t.SCRAPE_DAY)
+            for t in req.targets
+        ])
 
         return {
             "status": "ok",
-            "optimization_run_id": optimization_run_id,
-            "stdout": stdout,
-            "stderr": stderr,
+            "optimization_run_ids": optimization_run_ids,
         }
 
     except Exception as e:
@@ -1,6 +1,7 @@
 import logging
 from fastapi import APIRouter, Query
 from app.services.shuttle_timeline_service import load_shuttle_timelines
+from app.utils.response_cache import cache_generation, get_cached, set_cached, SHUTTLE_TIMELINE
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +13,11 @@ def get_shuttle_timeline(run_id: int = Query(..., description="optimization_run.
     Returns authoritative shuttle timelines reconstructed from
     run.routing_results (ordered by vehicle_id, sequence).
     """
+    cached = get_cached(SHUTTLE_TIMELINE, run_id)
+    if cached is not None:
+        return cached
+
+    generation = cache_generation(SHUTTLE_TIMELINE)
     logger.info(f"[ShuttleTimeline] Loading timeline for run_id={run_id}")
 
     timelines = load_shuttle_timelines(run_id)
@@ -22,8 +28,10 @@ def get_shuttle_timeline(run_id: int = Query(..., description="optimization_run.
             "message": f"No routing_results found for run_id={run_id}"
         }
 
-    return {
+    result = {
         "status": "ok",
         "run_id": run_id,
         "vehicles": timelines
     }
+    set_cached(SHUTTLE_TIMELINE, run_id, result, generation=generation)
+    return result
@@ -1,16 +1,19 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Query
 from app.services import task_split_service
+from app.utils.response_cache import drop_cached, TIME_MATRIX, ORTOOLS_PAYLOAD
 
 router = APIRouter()
 
 @router.post("/split")
-def split_pick_drop_tasks(run_id: int = Query(1, description="Optimization run ID")):
+async def split_pick_drop_tasks(run_id: int = Query(1, description="Optimization run ID")):
     """
     Convert records from stg.hug_raw_requests into PICK/DROP tasks
     and insert them into run.routing_tasks.
     """
     try:
-        result = task_split_service.split_and_create_tasks(run_id=run_id)
+        result = await asyncio.to_thread(task_split_service.split_and_create_tasks, run_id=run_id)
+        drop_cached(TIME_MATRIX, ORTOOLS_PAYLOAD, key=run_id)
         return {"status": "success", **result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Task split failed: {e}")
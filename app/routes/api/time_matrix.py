@@ -1,12 +1,26 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from app.services.time_matrix_service import build_time_matrix
+from app.utils.response_cache import cache_generation, get_cached, set_cached, TIME_MATRIX
+from app.utils.singleflight import single_flight
 
 router = APIRouter()
 
+async def _load_matrix(run_id: int) -> dict:
+    # Generation taken inside the flight: callers joining late must not cache a pre-drop load
+    generation = cache_generation(TIME_MATRIX)
+    result = await asyncio.to_thread(build_time_matrix, run_id)
+    if result.get("status") == "ok":
+        set_cached(TIME_MATRIX, run_id, result, generation=generation)
+    return result
+
 @router.post("/matrix")
 async def generate_matrix(run_id: int):
+    cached = get_cached(TIME_MATRIX, run_id)
+    if cached is not None:
+        return cached
+
     try:
-        result = build_time_matrix(run_id)
-        return result
+        return await single_flight(TIME_MATRIX, run_id, lambda: _load_matrix(run_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,70 +1,183 @@
 from dotenv import load_dotenv
+import argparse
+import asyncio
+import json
 import os
 import re
-from datetime import datetime
-from playwright.sync_api import sync_playwright, expect, TimeoutError as PlaywrightTimeout
-from app.supabase import get_supabase
+import tempfile
+from datetime import date
+from typing import Awaitable, Callable
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright, TimeoutError as PlaywrightTimeout
+from postgrest.types import ReturnMethod
+from app.supabase import get_async_schema
+from app.utils.ratelimit import SUPABASE_LIMITER
 
 # optimization_run helpers
 from app.services.optimization_run import (
     get_existing_run,
     create_new_run,
-    set_status_scraping,
-    set_status_optimizing,
-    set_status_scrape_error,
-    set_meta_json,
+    set_status,
 )
 
 # ==========================================
 # Load environment variables
 # ==========================================
 load_dotenv()
-print("DOTENV CHECK:",
-        os.getenv("SCRAPE_FACILITY"),
-        os.getenv("SCRAPE_YEAR"),
-        os.getenv("SCRAPE_MONTH"),
-        os.getenv("SCRAPE_DAY"))
 
 USERNAME = os.getenv("HUG_USERNAME")
 PASSWORD = os.getenv("HUG_PASSWORD")
 
-SCRAPE_FACILITY = os.getenv("SCRAPE_FACILITY")
-SCRAPE_YEAR = os.getenv("SCRAPE_YEAR")
-SCRAPE_MONTH = os.getenv("SCRAPE_MONTH")
-SCRAPE_DAY = os.getenv("SCRAPE_DAY")
+# ==========================================
+# HUG site constants
+# ==========================================
+HUG_LOGIN_URL = "https://www.hug-gioire.link/hug/wm/"
+FACILITY_CHECKBOX = '#facility_check input[value="{}"]'
+TABLE_WAIT_MS = 10000
+
+PICKUP = "迎え"
+DROPOFF = "送り"
+# (wrapper div class, pickup_flag) per table section
+TABLE_SECTIONS = (("pickTableWrap", PICKUP), ("sendTableWrap", DROPOFF))
+
+# ==========================================
+# Scraper settings
+# ==========================================
+# Headful + slow_mo are for local debugging only
+HEADLESS = os.getenv("PLAYWRIGHT_HEADLESS", "1") == "1"
+SLOW_MO = int(os.getenv("PLAYWRIGHT_SLOW_MO", "0"))
+DEFAULT_TIMEOUT_MS = int(os.getenv("PLAYWRIGHT_TIMEOUT_MS", "5000"))
+# The announcement popup is optional; this is how long we pay when it doesn't show
+POPUP_TIMEOUT_MS = int(os.getenv("HUG_POPUP_TIMEOUT_MS", "1500"))
+
+INSERT_BATCH_SIZE = 1000
+
+# Scheduled time cell, e.g. "9:05" or "9：05" (full-width colon)
+_TIME_RE = re.compile(r"(\d{1,2})[:：](\d{2})")
+
+# Concurrent scrapes share one browser (one context each); cap what the HUG site sees
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+_scrape_slots = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+
+# Saved login session (cookies/localStorage); the login form is only used when it has expired
+STORAGE_STATE_PATH = os.getenv("HUG_STORAGE_STATE_PATH", ".hug_state.json")
+
+# Assets the scrape never needs; scripts/XHR stay on since the tables are JS-driven
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+
+
+# ==========================================
+# Row harvest (runs in the browser, one round-trip for all sections)
+# ==========================================
+_HARVEST_ROWS_JS = r"""(sections) => {
+    const KANA_LINE = /^[ぁ-ゖー\s]+$/;
+    const HONORIFIC = /(さん|くん|ちゃん)\s*$/;
+    const SPACES = /[ 　]/g;
+
+    // Last non-kana line of the name box, without honorific or spaces
+    const cleanName = (raw) => {
+        const lines = raw.split('\n');
+        for (let i = lines.length - 1; i >= 0; i--) {
+            const line = lines[i].trim();
+            if (!line || KANA_LINE.test(line)) continue;
+            return line.replace(HONORIFIC, '').replace(SPACES, '');
+        }
+        return '';
+    };
+
+    // sections: [[wrapperClass, pickupFlag], ...], harvested in order
+    return sections.flatMap(([wrapperClass, pickupFlag]) =>
+        Array.from(document.querySelectorAll(`div.${wrapperClass} table tbody tr`))
+            .filter(r => r.querySelector('div.nameBox'))
+            .map(r => {
+                const time = r.querySelector('td.greet_time_scheduled')?.innerText.trim();
+                return {
+                    target_time: time && time !== '9999' ? time : null,
+                    user_name: cleanName(r.querySelector('div.nameBox').innerText),
+                    depot_name: r.querySelectorAll('td')[2]?.innerText.trim() ?? null,
+                    place: r.querySelector('td.absence')
+                        ? '欠席'
+                        : (r.querySelector('td.place')?.innerText.trim() ?? '送迎なし'),
+                    pickup_flag: pickupFlag,
+                };
+            })
+    );
+}"""
+
+
+# ==========================================
+# Browser (long-lived, one context per scrape)
+# ==========================================
+async def launch_browser(playwright: Playwright) -> Browser:
+    return await playwright.chromium.launch(
+        headless=HEADLESS,
+        slow_mo=SLOW_MO,
+        args=[
+            "--disable-gpu",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-renderer-backgrounding",
+            "--mute-audio",
+        ]
+    )
+
+
+async def _block_assets(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
 
 
 # ==========================================
 # Login flow (stable)
 # ==========================================
-def login_and_open_shuttle_page(page):
+def _save_storage_state(state: dict) -> None:
+    """Write the session file atomically; parallel sessions may log in at the same time."""
+    directory = os.path.dirname(os.path.abspath(STORAGE_STATE_PATH))
+    with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+        json.dump(state, f)
+    os.replace(f.name, STORAGE_STATE_PATH)
+
+
+async def login_and_open_shuttle_page(page):
     print("Opening login page...")
-    page.goto("https://www.hug-gioire.link/hug/wm/")
+    # The form is server-rendered; no need to wait for every subresource
+    await page.goto(HUG_LOGIN_URL, wait_until="domcontentloaded")
 
-    print("Filling login form...")
-    page.get_by_role("textbox", name="ログインID").fill(USERNAME)
-    page.get_by_role("textbox", name="パスワード").fill(PASSWORD)
+    login_id = page.get_by_role("textbox", name="ログインID")
+    if await login_id.count() == 0:
+        print("🔑 Reusing saved session")
+    else:
+        print("Filling login form...")
+        await login_id.fill(USERNAME)
+        await page.get_by_role("textbox", name="パスワード").fill(PASSWORD)
 
-    page.get_by_role("button", name="ログインする").click()
-    print("Login submitted...")
+        await page.get_by_role("button", name="ログインする").click()
+        print("Login submitted...")
+
+        # Save cookies so later scrapes can skip the login form
+        await page.wait_for_load_state()
+        _save_storage_state(await page.context.storage_state())
 
     try:
-        page.get_by_role("button", name=" 閉じる").click(timeout=3000)
+        await page.get_by_role("button", name=" 閉じる").click(timeout=POPUP_TIMEOUT_MS)
         print("🧹 Popup closed")
     except PlaywrightTimeout:
             print("ℹ️ No popup appeared (OK)")
 
-    page.get_by_role("link", name=" 今日の送迎").click()
+    await page.get_by_role("link", name=" 今日の送迎").click()
     print("✅ Opened today’s pickup & drop-off page")
 
 
 # ==========================================
 # Date selection
 # ==========================================
-def select_date(page, year, month, day):
+async def select_date(page, year, month, day):
     print(f"Selecting date: {year}-{month}-{day}")
 
-    page.get_by_role("listitem").filter(has_text="日付").click()
+    await page.get_by_role("listitem").filter(has_text="日付").click()
 
     # Convert month/day to single-digit numbers when needed
     year_str = str(int(year))
@@ -72,147 +185,158 @@ def select_date(page, year, month, day):
     day_str = str(int(day))       # ensures "03" -> "3"
 
     # Select year
-    page.locator("#ui-datepicker-div").get_by_role("combobox").first.select_option(year_str)
+    await page.locator("#ui-datepicker-div").get_by_role("combobox").first.select_option(year_str)
 
     # Select month
-    page.locator("#ui-datepicker-div").get_by_role("combobox").nth(1).select_option(month_str)
+    await page.locator("#ui-datepicker-div").get_by_role("combobox").nth(1).select_option(month_str)
 
     # Select day (EXACT match)
-    page.get_by_role("link", name=day_str, exact=True).click()
+    await page.get_by_role("link", name=day_str, exact=True).click()
 
     # Close datepicker if needed
     try:
-        page.get_by_role("button", name="閉じる").click(timeout=500)
+        await page.get_by_role("button", name="閉じる").click(timeout=500)
     except:
         pass
 
-    expected = f"{year}/{month.zfill(2)}/{day.zfill(2)}"
-    expect(page.get_by_role("textbox")).to_have_value(expected)
+    expected = f"{int(year)}/{int(month):02d}/{int(day):02d}"
+    # Polls inside the browser instead of one round-trip per check
+    await page.wait_for_function(
+        "v => Array.from(document.querySelectorAll('input[type=text]')).some(i => i.value === v)",
+        arg=expected,
+        timeout=DEFAULT_TIMEOUT_MS,
+    )
 
     print("✔ Date selected")
-    page.get_by_role("button", name="表示変更").click()
+    await page.get_by_role("button", name="表示変更").click()
     print("✔ Filter applied")
 
 
-# ==========================================
-# Clean name extraction
-# ==========================================
-def extract_clean_name(raw_text: str) -> str:
-    if not raw_text:
-        return ""
-
-    lines = [line.strip() for line in raw_text.split("\n") if line.strip()]
-    last_line = ""
-
-    for line in lines:
-        if re.fullmatch(r"[ぁ-ゖー\s]+", line):
-            continue
-        last_line = line
-
-    last_line = re.sub(r"(さん|くん|ちゃん)\s*$", "", last_line)
-    last_line = last_line.replace(" ", "").replace("　", "")
-    return last_line
-
-
 # ==========================================
 # Scrape a single facility
 # ==========================================
-def scrape_single_facility(page, facility_name):
+async def scrape_single_facility(page, facility_name):
     print(f"\n🔎 Scraping facility: {facility_name}")
 
-    page.get_by_role("link", name="すべて解除").click()
-    page.locator(f'#facility_check input[value="{facility_name}"]').check()
-    page.get_by_role("button", name="表示変更").click()
-
-    page.locator("div.pickTableWrap").wait_for(timeout=10000)
-    page.locator("div.sendTableWrap").wait_for(timeout=10000)
+    await page.get_by_role("link", name="すべて解除").click()
+    await page.locator(FACILITY_CHECKBOX.format(facility_name)).check()
+    await page.get_by_role("button", name="表示変更").click()
 
-    rows_all = []
+    # The tables are rebuilt by JS from the filter's XHR. Once the network is idle that
+    # response has arrived, so a section still without a table is a genuinely empty day
+    await page.wait_for_load_state("networkidle", timeout=TABLE_WAIT_MS)
 
-    def scrape_section(wrapper_class, pickup_flag):
-        wrapper = page.locator(f"div.{wrapper_class}")
-        if wrapper.locator("table").count() == 0:
+    # Sections that did get a table: wait for its rows (or an empty body), concurrently
+    async def section_ready(wrapper_class):
+        w = f"div.{wrapper_class}"
+        if await page.locator(f"{w} table").count() == 0:
             return
+        await page.wait_for_selector(
+            f"{w} table tbody tr, {w} table:not(:has(tbody tr))",
+            state="attached",
+            timeout=TABLE_WAIT_MS,
+        )
 
-        for row in wrapper.locator("table tbody tr").all():
+    await asyncio.gather(*(section_ready(wrapper_class) for wrapper_class, _ in TABLE_SECTIONS))
 
-            if row.locator("div.nameBox").count() == 0:
-                continue
+    rows_all = await page.evaluate(_HARVEST_ROWS_JS, [list(section) for section in TABLE_SECTIONS])
 
-            tcell = row.locator("td.greet_time_scheduled")
-            time_val = None
-            if tcell.count() > 0:
-                raw = tcell.inner_text().strip()
-                if raw and raw != "9999":
-                    time_val = raw
+    print(f"✔ Scraped {len(rows_all)} rows")
+    return rows_all
 
-            raw_name = row.locator("div.nameBox").inner_text().strip()
-            user_name = extract_clean_name(raw_name)
 
-            depot_cell = row.locator("td").nth(2)
-            depot_name = depot_cell.inner_text().strip() if depot_cell.count() > 0 else None
+# ==========================================
+# Scrape in an isolated browser context
+# ==========================================
+async def _new_context(browser: Browser) -> BrowserContext:
+    context = await browser.new_context(
+        storage_state=STORAGE_STATE_PATH if os.path.exists(STORAGE_STATE_PATH) else None
+    )
+    # Context-level: also covers popups/new tabs opened by the site
+    context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+    await context.route("**/*", _block_assets)
+    return context
 
-            if row.locator("td.absence").count() > 0:
-                place = "欠席"
-            else:
-                pcell = row.locator("td.place")
-                place = pcell.inner_text().strip() if pcell.count() > 0 else "送迎なし"
 
-            rows_all.append({
-                "target_time": time_val,
-                "user_name": user_name,
-                "depot_name": depot_name,
-                "place": place,
-                "pickup_flag": pickup_flag,
-            })
+async def scrape(browser: Browser, facility, year, month, day) -> list[dict]:
+    async with _scrape_slots:
+        context = await _new_context(browser)
+        try:
+            page = await context.new_page()
 
-    scrape_section("pickTableWrap", "迎え")
-    scrape_section("sendTableWrap", "送り")
+            await login_and_open_shuttle_page(page)
+            await select_date(page, year, month, day)
 
-    print(f"✔ Scraped {len(rows_all)} rows")
-    return rows_all
+            return await scrape_single_facility(page, facility)
+        finally:
+            await context.close()
 
 
 # ==========================================
 # Insert into Supabase
 # ==========================================
-def insert_scraped_data_to_supabase(rows, route_date):
-    supabase = get_supabase()
-
-    formatted = []
-    for row in rows:
-        target_dt = None
-        if row["target_time"]:
-            cleaned = row["target_time"].replace("：", ":")
-            target_dt = datetime.strptime(f"{route_date} {cleaned}", "%Y-%m-%d %H:%M")
-
-        formatted.append({
-            "pickup_flag": row["pickup_flag"] == "迎え",
-            "user_name": row["user_name"],
-            "depot_name": row["depot_name"],
-            "place": row["place"],
-            "target_time": target_dt.isoformat() if target_dt else None,
-            "payload": row,
-        })
-
-    supabase.schema("stg").from_("hug_raw_requests").insert(formatted).execute()
+def _iso_target_time(route_date: str, raw_time: str) -> str | None:
+    """'9:05' / '9：05' on route_date → '2025-01-31T09:05:00'; None if it isn't a HH:MM time."""
+    m = _TIME_RE.fullmatch(raw_time)
+    return f"{route_date}T{int(m[1]):02d}:{m[2]}:00" if m else None
+
+
+def _format_row(row: dict, iso_by_time: dict[str, str | None]) -> dict:
+    raw_time = row["target_time"]
+    target_iso = iso_by_time.get(raw_time)
+    return {
+        "pickup_flag": row["pickup_flag"] == PICKUP,
+        "user_name": row["user_name"],
+        "depot_name": row["depot_name"],
+        "place": row["place"],
+        "target_time": target_iso,
+        # Flat columns carry everything else (and meta_json keeps the full scrape);
+        # only a time cell that failed to parse has nowhere else to live
+        "payload": {"target_time": raw_time} if raw_time and target_iso is None else None,
+    }
+
+
+def _format_rows(rows, route_date) -> list[dict]:
+    # Many users share a slot (e.g. every 16:00 drop-off); parse each distinct HH:MM once
+    iso_by_time = {
+        t: _iso_target_time(route_date, t)
+        for t in {row["target_time"] for row in rows if row["target_time"]}
+    }
+    return [_format_row(row, iso_by_time) for row in rows]
+
+
+async def insert_scraped_data_to_supabase(rows, route_date):
+    formatted = _format_rows(rows, route_date)
+
+    async def insert_chunk(chunk):
+        async with SUPABASE_LIMITER:
+            # return=minimal: the inserted rows are not needed back
+            await get_async_schema("stg").from_("hug_raw_requests").insert(
+                chunk, returning=ReturnMethod.minimal
+            ).execute()
+
+    # Bounded request bodies for large days, sent concurrently; one round-trip for typical volumes
+    await asyncio.gather(*(
+        insert_chunk(formatted[i:i + INSERT_BATCH_SIZE])
+        for i in range(0, len(formatted), INSERT_BATCH_SIZE)
+    ))
 
 
 # ==========================================
 # MAIN
 # ==========================================
-def main():
-    facility = SCRAPE_FACILITY
-    route_date = f"{SCRAPE_YEAR}-{SCRAPE_MONTH.zfill(2)}-{SCRAPE_DAY.zfill(2)}"
+async def _record_run(facility, year, month, day, do_scrape: Callable[[], Awaitable[list[dict]]]) -> int:
+    """
+    Wrap one facility/date scrape in its optimization_run lifecycle.
+    Returns the optimization_run id (existing or newly created).
+    """
+    route_date = f"{int(year):04d}-{int(month):02d}-{int(day):02d}"
 
-    existing = get_existing_run(facility, route_date)
+    existing = await asyncio.to_thread(get_existing_run, facility, route_date)
 
     if existing:
         run_id = existing["id"]
 
-        # 👇 CRITICAL: emit run id in the same format as new runs
-        print(f"__RUN_ID__={run_id}")
-
         print("⚠ Existing run found for this facility + date.")
         print(f"ℹ Current status: {existing['status']}")
 
@@ -221,60 +345,150 @@ def main():
         print(f"ℹ Previous run imported {row_count} rows.")
 
         print("ℹ Already imported — skipping scrape.")
-        return
+        return run_id
 
 
     # Create new run
-    run_id = create_new_run(facility, route_date, requested_by="system")
-    print(f"__RUN_ID__={run_id}")
-    set_status_scraping(run_id)
+    run_id = await asyncio.to_thread(create_new_run, facility, route_date, requested_by="system")
+    await asyncio.to_thread(set_status, run_id, "scraping", started=True)
     print("✔ Run moved to scraping status")
 
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--disable-gpu", "--no-sandbox"]
-            )
-            page = browser.new_page()
-
-            login_and_open_shuttle_page(page)
-            select_date(page, SCRAPE_YEAR, SCRAPE_MONTH, SCRAPE_DAY)
-
-            rows = scrape_single_facility(page, facility)
+        rows = await do_scrape()
 
-            browser.close()
-
-
-        # Save meta_json snapshot
-        set_meta_json(run_id, {
+        # Move to optimizing and save the meta_json snapshot in one update
+        await asyncio.to_thread(set_status, run_id, "optimizing", finished=True, meta={
             "facility_name": facility,
             "route_date": route_date,
             "row_count": len(rows),
             "rows": rows,
         })
-        print("ℹ Scraped rows recorded in meta_json")
-
-        # Move to optimizing
-        set_status_optimizing(run_id)
-        print("✔ Run moved to optimizing status")
+        print("✔ Run moved to optimizing status (scraped rows recorded in meta_json)")
 
         # Insert rows only if not empty
         if len(rows) > 0:
             print("🚀 Inserting scraped data into Supabase...")
-            insert_scraped_data_to_supabase(rows, route_date)
+            await insert_scraped_data_to_supabase(rows, route_date)
             print("✔ Saved rows to Supabase")
 
     except PlaywrightTimeout:
         print("❌ TIMEOUT — marking scrape_error")
-        set_status_scrape_error(run_id)
-        return
+        await asyncio.to_thread(set_status, run_id, "scrape_error", finished=True)
 
     except Exception as e:
         print("❌ ERROR:", e)
-        set_status_scrape_error(run_id)
-        return
+        await asyncio.to_thread(set_status, run_id, "scrape_error", finished=True)
+
+    return run_id
+
+
+async def main(browser: Browser, facility: str, year: int | str, month: int | str, day: int | str) -> int:
+    """
+    Scrape HUG for one facility/date and record it as an optimization_run.
+    Returns the optimization_run id (existing or newly created).
+    """
+    return await _record_run(
+        facility, year, month, day,
+        lambda: scrape(browser, facility, year, month, day),
+    )
+
+
+async def _run_session(browser: Browser, targets: list[tuple[str, int, int, int]]) -> list[int]:
+    """
+    Scrape several (facility, year, month, day) targets in one logged-in session.
+    Login happens once; each target only re-selects the date and facility.
+    """
+    async with _scrape_slots:
+        context = None
+        setup_error: Exception | None = None
+        try:
+            context = await _new_context(browser)
+            page = await context.new_page()
+            await login_and_open_shuttle_page(page)
+        except Exception as e:
+            print("❌ Session setup failed:", e)
+            setup_error = e
+
+        try:
+            run_ids = []
+            for facility, year, month, day in targets:
+                if setup_error is not None:
+                    # Record the failed login/navigation on every target's run (scrape_error)
+                    async def scrape_target(error=setup_error):
+                        raise error
+                else:
+                    async def scrape_target(facility=facility, year=year, month=month, day=day):
+                        await select_date(page, year, month, day)
+                        return await scrape_single_facility(page, facility)
+
+                run_ids.append(await _record_run(facility, year, month, day, scrape_target))
+            return run_ids
+        finally:
+            if context is not None:
+                await context.close()
+
+
+async def run_batch(browser: Browser, targets: list[tuple[str, int, int, int]]) -> list[int]:
+    """
+    Scrape many targets across up to SCRAPE_CONCURRENCY parallel contexts on the shared browser.
+    Targets are dealt round-robin to the sessions; each session logs in once.
+    Returns one optimization_run id per target, in order.
+    """
+    if not targets:
+        return []
+
+    n = min(SCRAPE_CONCURRENCY, len(targets))
+    per_session = await asyncio.gather(*(_run_session(browser, targets[i::n]) for i in range(n)))
+
+    run_ids: list[int] = [0] * len(targets)
+    for i, ids in enumerate(per_session):
+        run_ids[i::n] = ids
+    return run_ids
+
+
+async def _run_standalone(facility, year, month, day) -> int:
+    async with async_playwright() as p:
+        browser = await launch_browser(p)
+        try:
+            return await main(browser, facility, year, month, day)
+        finally:
+            await browser.close()
+
+
+def _parse_args() -> argparse.Namespace:
+    # Flags take precedence; SCRAPE_* env vars remain as a fallback for existing scripts
+    parser = argparse.ArgumentParser(description="Scrape HUG shuttle requests for one facility/date.")
+    parser.add_argument("--facility", default=os.getenv("SCRAPE_FACILITY"))
+    parser.add_argument("--year", type=int, default=os.getenv("SCRAPE_YEAR"))
+    parser.add_argument("--month", type=int, default=os.getenv("SCRAPE_MONTH"))
+    parser.add_argument("--day", type=int, default=os.getenv("SCRAPE_DAY"))
+    args = parser.parse_args()
+
+    # Fail here with a usage error rather than deep inside the scrape
+    missing = [
+        f"--{name} (or SCRAPE_{name.upper()})"
+        for name in ("facility", "year", "month", "day")
+        if not getattr(args, name)
+    ]
+    if missing:
+        parser.error("missing " + ", ".join(missing))
+    try:
+        date(args.year, args.month, args.day)
+    except ValueError as e:
+        parser.error(f"invalid date {args.year}-{args.month}-{args.day}: {e}")
+    # Credentials are only needed when there is no saved session to reuse
+    if not os.path.exists(STORAGE_STATE_PATH) and not (USERNAME and PASSWORD):
+        parser.error("HUG_USERNAME and HUG_PASSWORD must be set (no saved session found)")
+    return args
 
 
 if __name__ == "__main__":
-    main()
+    args = _parse_args()
+    run_id = asyncio.run(_run_standalone(args.facility, args.year, args.month, args.day))
+    print(f"__RUN_ID__={run_id}")
+
+    # Machine-readable result for callers that run this as a subprocess
+    run_id_out = os.getenv("RUN_ID_OUT")
+    if run_id_out:
+        with open(run_id_out, "w") as f:
+            json.dump({"run_id": run_id}, f)
@@ -1,30 +1,88 @@
-from app.supabase import get_supabase
+from __future__ import annotations
+from app.supabase import get_schema
 from datetime import datetime
+from typing import TYPE_CHECKING
 import logging
 
+if TYPE_CHECKING:
+    from app.routes.api.notion_sync import VehicleSyncPayload, DepotSyncPayload, UserSyncPayload
+
 logger = logging.getLogger(__name__)
 
-supabase = get_supabase()
+# Rows per bulk upsert request; keeps bodies well under PostgREST's payload limit
+UPSERT_BATCH_SIZE = 500
+LOOKUP_BATCH_SIZE = 100
+
+# Depot ids confirmed to exist in core.depots. Only hits are cached: a depot synced
+# after a miss must still resolve on the next lookup.
+_known_depot_ids: set[int] = set()
 
 def parse_iso_date(date_str):
-    """Convert ISO date string to standardized format."""
+    """Validate an ISO date string; Notion already emits ISO-8601, so it is returned as-is."""
     if not date_str:
         return None
     try:
-        return datetime.fromisoformat(date_str.replace("Z", "+00:00")).isoformat()
+        # Python < 3.11 rejects a trailing "Z"
+        datetime.fromisoformat(date_str[:-1] + "+00:00" if date_str.endswith("Z") else date_str)
+        return date_str
     except Exception:
         logger.warning(f"Failed to parse date: {date_str}")
         return None
 
-def json_safe(row: dict) -> dict:
-    """Convert datetime objects to JSON-serializable strings."""
-    safe = {}
-    for k, v in row.items():
-        if isinstance(v, datetime):
-            safe[k] = v.isoformat()
-        else:
-            safe[k] = v
-    return safe
+def _same_instant(a: str | None, b: str | None) -> bool:
+    if not a or not b:
+        return False
+    try:
+        return datetime.fromisoformat(a.replace("Z", "+00:00")) == datetime.fromisoformat(b.replace("Z", "+00:00"))
+    except ValueError:
+        return False
+
+def unchanged_page_ids(table: str, rows: list[dict]) -> set[str]:
+    """
+    notion_page_ids in `rows` whose stored core.<table> row already matches the incoming one:
+    same notion_last_edited and same values in every other column (including derived ones
+    like depot_id, so a row first written before its depot was synced still gets fixed).
+    """
+    incoming = {r["notion_page_id"]: r for r in rows if r["notion_last_edited"]}
+    page_ids = list(incoming)
+    if not page_ids:
+        return set()
+    columns = [c for c in rows[0] if c != "notion_last_edited"]
+
+    unchanged: set[str] = set()
+    # Page ids go in the query string; keep each lookup URL short
+    for i in range(0, len(page_ids), LOOKUP_BATCH_SIZE):
+        existing = (
+            get_schema("core")
+            .from_(table)
+            .select(", ".join(columns + ["notion_last_edited"]))
+            .in_("notion_page_id", page_ids[i:i + LOOKUP_BATCH_SIZE])
+            .execute()
+        ).data or []
+        for e in existing:
+            row = incoming[e["notion_page_id"]]
+            if (
+                _same_instant(e["notion_last_edited"], row["notion_last_edited"])
+                and all(e.get(c) == row[c] for c in columns)
+            ):
+                unchanged.add(e["notion_page_id"])
+    return unchanged
+
+def _bulk_upsert(table: str, rows: list[dict]) -> dict:
+    """Upsert rows into core.<table> on notion_page_id, skipping unchanged pages, one request per chunk."""
+    unchanged = unchanged_page_ids(table, rows)
+    rows = [r for r in rows if r["notion_page_id"] not in unchanged]
+
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        (
+            get_schema("core")
+            .from_(table)
+            .upsert(rows[i:i + UPSERT_BATCH_SIZE], on_conflict="notion_page_id")
+            .execute()
+        )
+
+    logger.info(f"Upserted {len(rows)} {table} ({len(unchanged)} unchanged, skipped)")
+    return {"status": "200", "upserted": len(rows), "skipped": len(unchanged)}
 
 def resolve_node_id(depot_name: str) -> int | None:
     """
@@ -46,8 +104,11 @@ def resolve_depot_id(notion_relation_id: int | str | None) -> int | None:
 
     try:
         depot_id = int(notion_relation_id)
+        if depot_id in _known_depot_ids:
+            return depot_id
+
         result = (
-            supabase.schema("core")
+            get_schema("core")
             .from_("depots")
             .select("id")
             .eq("id", depot_id)
@@ -56,6 +117,7 @@ def resolve_depot_id(notion_relation_id: int | str | None) -> int | None:
         )
         if result.data and len(result.data) > 0:
             logger.debug(f"resolve_depot_id(): Matched numeric relation_id={notion_relation_id} → depot_id={depot_id}")
+            _known_depot_ids.add(depot_id)
             return depot_id
         else:
             logger.warning(f"resolve_depot_id(): No depot found for relation_id={notion_relation_id}")
@@ -64,143 +126,215 @@ def resolve_depot_id(notion_relation_id: int | str | None) -> int | None:
         logger.error(f"resolve_depot_id() failed: {str(e)}")
         return None
 
+def resolve_depot_ids(relation_ids) -> dict[str, int]:
+    """
+    Batch form of resolve_depot_id: resolve many relation IDs with one IN query per chunk.
+    Returns relation ID → depot_id for the matches; IDs missing from the result had no depot.
+    """
+    wanted: dict[int, str] = {}
+    for rid in relation_ids:
+        try:
+            wanted[int(rid)] = str(rid)
+        except (TypeError, ValueError):
+            continue
+
+    pending = [d for d in wanted if d not in _known_depot_ids]
+    for i in range(0, len(pending), LOOKUP_BATCH_SIZE):
+        found = (
+            get_schema("core")
+            .from_("depots")
+            .select("id")
+            .in_("id", pending[i:i + LOOKUP_BATCH_SIZE])
+            .execute()
+        ).data or []
+        _known_depot_ids.update(r["id"] for r in found)
+
+    return {rid: d for d, rid in wanted.items() if d in _known_depot_ids}
+
 # ===============================
 # VEHICLE
 # ===============================
-def upsert_vehicle(payload: dict) -> dict:
-    """Insert or update a vehicle record from Notion 車両DB."""
-    try:
-        vehicle_name = payload.get("vehicle_name")
-        facility_relation_id = payload.get("facility_relation_id")
-        seats = payload.get("seats")
-        active = payload.get("active", True)
-        notion_page_id = payload.get("notion_page_id")
-        notion_last_edited = parse_iso_date(payload.get("notion_last_edited"))
-
-        if not vehicle_name or not notion_page_id:
-            raise ValueError("Missing vehicle_name or notion_page_id")
-        
-        if seats is not None:
-            try:
-                seats = int(seats)
-            except ValueError:
-                raise ValueError("Seats must be an integer")
+def _build_vehicle_row(payload: VehicleSyncPayload, depot_ids: dict[str, int] | None = None) -> dict:
+    """
+    Validate a vehicle payload and map it to a core.vehicles row.
+    `depot_ids` (from resolve_depot_ids) replaces the per-row depot lookup in bulk syncs.
+    """
+    vehicle_name = payload.vehicle_name
+    facility_relation_id = payload.facility_relation_id
+    seats = payload.seats
+    active = payload.active
+    notion_page_id = payload.notion_page_id
+    notion_last_edited = parse_iso_date(payload.notion_last_edited)
 
+    if not vehicle_name or not notion_page_id:
+        raise ValueError("Missing vehicle_name or notion_page_id")
+    
+    if seats is not None:
+        try:
+            seats = int(seats)
+        except ValueError:
+            raise ValueError("Seats must be an integer")
+
+    if depot_ids is None:
         depot_id = resolve_depot_id(facility_relation_id)
-        if not depot_id:
-            logger.warning(f"No matching depot found for relation_id={facility_relation_id}.")
-
-        # Build row
-        row = json_safe({
-            "vehicle_name": vehicle_name,
-            "depot_id": depot_id,
-            "seats": seats,
-            "active": active,
-            "notion_page_id": notion_page_id,
-            "notion_last_edited": notion_last_edited,
-        })
+    else:
+        depot_id = depot_ids.get(str(facility_relation_id)) if facility_relation_id else None
+    if not depot_id:
+        logger.warning(f"No matching depot found for relation_id={facility_relation_id}.")
+
+    return {
+        "vehicle_name": vehicle_name,
+        "depot_id": depot_id,
+        "seats": seats,
+        "active": active,
+        "notion_page_id": notion_page_id,
+        "notion_last_edited": notion_last_edited,
+    }
+
+def upsert_vehicle(payload: VehicleSyncPayload) -> dict:
+    """Insert or update a vehicle record from Notion 車両DB."""
+    try:
+        row = _build_vehicle_row(payload)
 
         result = (
-            supabase.schema("core")
+            get_schema("core")
             .from_("vehicles")
             .upsert(row, on_conflict="notion_page_id")
             .execute()
         )
 
-        logger.info(f"Upserted vehicle: {vehicle_name}")
+        logger.info(f"Upserted vehicle: {row['vehicle_name']}")
         return {"status": "200", "vehicle": row, "result": result.data}
 
     except Exception as e:
         logger.error(f"upsert_vehicle() failed: {str(e)}")
         raise
 
+def upsert_vehicles(payloads: list[VehicleSyncPayload]) -> dict:
+    """Insert or update many vehicles from Notion 車両DB in bulk (one request per chunk)."""
+    try:
+        depot_ids = resolve_depot_ids(p.facility_relation_id for p in payloads if p.facility_relation_id)
+        return _bulk_upsert("vehicles", [_build_vehicle_row(p, depot_ids) for p in payloads])
+    except Exception as e:
+        logger.error(f"upsert_vehicles() failed: {str(e)}")
+        raise
+
 # ===============================
 # FACILITY / DEPOT
 # ===============================
-def upsert_depot(payload: dict) -> dict:
+def _build_depot_row(payload: DepotSyncPayload) -> dict:
+    """Validate a depot payload and map it to a core.depots row."""
+    depot_name = payload.depot_name
+    notion_page_id = payload.notion_page_id
+    notion_last_edited = parse_iso_date(payload.notion_last_edited)
+    active = payload.active
+
+    if not depot_name or not notion_page_id:
+        raise ValueError("Missing depot_name or notion_page_id")
+
+    depot_node_id = resolve_node_id(depot_name)
+
+    return {
+        "depot_name": depot_name,
+        "depot_node_id": depot_node_id,
+        "active": active,
+        "notion_page_id": notion_page_id,
+        "notion_last_edited": notion_last_edited,
+    }
+
+def upsert_depot(payload: DepotSyncPayload) -> dict:
     """
     Insert or update a facility (depot) record from Notion 事業所DB.
     Following nullable-FK design: depot_node_id is optional and can be linked later.
     """
     try:
-        depot_name = payload.get("depot_name")
-        notion_page_id = payload.get("notion_page_id")
-        notion_last_edited = parse_iso_date(payload.get("notion_last_edited"))
-        active = payload.get("active", True)
-
-        if not depot_name or not notion_page_id:
-            raise ValueError("Missing depot_name or notion_page_id")
-
-        depot_node_id = resolve_node_id(depot_name)
-
-        # Build row
-        row = json_safe({
-            "depot_name": depot_name,
-            "depot_node_id": depot_node_id,
-            "active": active,
-            "notion_page_id": notion_page_id,
-            "notion_last_edited": notion_last_edited,
-        })
+        row = _build_depot_row(payload)
 
         result = (
-            supabase.schema("core")
+            get_schema("core")
             .from_("depots")
             .upsert(row, on_conflict="notion_page_id")
             .execute()
         )
 
-        logger.info(f"Upserted depot: {depot_name}")
+        logger.info(f"Upserted depot: {row['depot_name']}")
         return {"status": "200", "depot": row, "result": result.data}
 
     except Exception as e:
         logger.error(f"upsert_depot() failed: {str(e)}")
         raise
 
+def upsert_depots(payloads: list[DepotSyncPayload]) -> dict:
+    """Insert or update many facilities (depots) from Notion 事業所DB in bulk."""
+    try:
+        return _bulk_upsert("depots", [_build_depot_row(p) for p in payloads])
+    except Exception as e:
+        logger.error(f"upsert_depots() failed: {str(e)}")
+        raise
+
 # ===============================
 # USER
 # ===============================
-def upsert_user(payload: dict) -> dict:
+def _build_user_row(payload: UserSyncPayload, depot_ids: dict[str, int] | None = None) -> dict:
     """
-    Insert or update a user record from Notion 利用者DB.
-    Combines user's name and reading name using a full-width space.
+    Validate a user payload and map it to a core.users row.
+    The relation is only checked (depot_id is fixed for now); `depot_ids` as in _build_vehicle_row.
     """
-    try:
-        user_name = payload.get("user_name")
-        facility_relation_id = payload.get("facility_relation_id")
-        notion_page_id = payload.get("notion_page_id")
-        notion_last_edited = parse_iso_date(payload.get("notion_last_edited"))
-        active = payload.get("active", True)
+    user_name = payload.user_name
+    facility_relation_id = payload.facility_relation_id
+    notion_page_id = payload.notion_page_id
+    notion_last_edited = parse_iso_date(payload.notion_last_edited)
+    active = payload.active
 
-        if not user_name or not notion_page_id:
-            raise ValueError("Missing user_name or notion_page_id")
+    if not user_name or not notion_page_id:
+        raise ValueError("Missing user_name or notion_page_id")
 
+    if depot_ids is None:
         depot_id = resolve_depot_id(facility_relation_id)
-        if not depot_id:
-            logger.warning(f"No matching depot found for relation_id={facility_relation_id}.")
-
-        # Build row
-        row = json_safe({
-            "user_name": user_name,
-            "depot_id": 1,
-            "active": active,
-            "notion_page_id": notion_page_id,
-            "notion_last_edited": notion_last_edited,
-        })
+    else:
+        depot_id = depot_ids.get(str(facility_relation_id)) if facility_relation_id else None
+    if not depot_id:
+        logger.warning(f"No matching depot found for relation_id={facility_relation_id}.")
+
+    return {
+        "user_name": user_name,
+        "depot_id": 1,
+        "active": active,
+        "notion_page_id": notion_page_id,
+        "notion_last_edited": notion_last_edited,
+    }
+
+def upsert_user(payload: UserSyncPayload) -> dict:
+    """
+    Insert or update a user record from Notion 利用者DB.
+    Combines user's name and reading name using a full-width space.
+    """
+    try:
+        row = _build_user_row(payload)
 
         result = (
-            supabase.schema("core")
+            get_schema("core")
             .from_("users")
             .upsert(row, on_conflict="notion_page_id")
             .execute()
         )
 
-        logger.info(f"Upserted user: {user_name}")
+        logger.info(f"Upserted user: {row['user_name']}")
         return {"status": "200", "user": row, "result": result.data}
 
     except Exception as e:
         logger.error(f"upsert_user() failed: {str(e)}")
         raise
 
+def upsert_users(payloads: list[UserSyncPayload]) -> dict:
+    """Insert or update many users from Notion 利用者DB in bulk."""
+    try:
+        depot_ids = resolve_depot_ids(p.facility_relation_id for p in payloads if p.facility_relation_id)
+        return _bulk_upsert("users", [_build_user_row(p, depot_ids) for p in payloads])
+    except Exception as e:
+        logger.error(f"upsert_users() failed: {str(e)}")
+        raise
+
 # ========== NODES ==========
 # def upsert_node(payload: dict) -> dict:
 # TODO: Insert or update a node record.
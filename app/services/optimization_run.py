@@ -1,14 +1,13 @@
 from datetime import datetime
-from app.supabase import get_supabase
+from app.supabase import get_schema
 
 
 # ============================================================
 # Fetch existing run (facility + date)
 # ============================================================
 def get_existing_run(facility_name: str, route_date: str):
-    supabase = get_supabase()
     res = (
-        supabase.schema("run")
+        get_schema("run")
         .from_("optimization_run")
         .select("*")
         .eq("facility_name", facility_name)
@@ -22,7 +21,6 @@ def get_existing_run(facility_name: str, route_date: str):
 # Create new run
 # ============================================================
 def create_new_run(facility_name: str, route_date: str, requested_by="system"):
-    supabase = get_supabase()
     payload = {
         "facility_name": facility_name,
         "route_date": route_date,
@@ -32,7 +30,7 @@ def create_new_run(facility_name: str, route_date: str, requested_by="system"):
     }
 
     res = (
-        supabase.schema("run")
+        get_schema("run")
         .from_("optimization_run")
         .insert(payload)
         .execute()
@@ -42,49 +40,20 @@ def create_new_run(facility_name: str, route_date: str, requested_by="system"):
 
 
 # ============================================================
-# Update status: scraping
+# Update status (optionally stamping started_at / finished_at)
 # ============================================================
-def set_status_scraping(run_id: int):
-    supabase = get_supabase()
-    supabase.schema("run").from_("optimization_run").update(
-        {
-            "status": "scraping",
-            "started_at": datetime.utcnow().isoformat(),
-        }
-    ).eq("id", run_id).execute()
+def set_status(run_id: int, status: str, started: bool = False, finished: bool = False, meta: dict | None = None):
+    """
+    Move a run to `status` in a single UPDATE.
+    Pass `meta` to save the meta_json snapshot in the same round trip.
+    """
+    patch = {"status": status}
+    now = datetime.utcnow().isoformat()
+    if started:
+        patch["started_at"] = now
+    if finished:
+        patch["finished_at"] = now
+    if meta is not None:
+        patch["meta_json"] = meta
 
-
-# ============================================================
-# Update status: optimizing
-# ============================================================
-def set_status_optimizing(run_id: int):
-    supabase = get_supabase()
-    supabase.schema("run").from_("optimization_run").update(
-        {
-            "status": "optimizing",
-            "finished_at": datetime.utcnow().isoformat(),
-        }
-    ).eq("id", run_id).execute()
-
-
-# ============================================================
-# Update status: scrape_error
-# ============================================================
-def set_status_scrape_error(run_id: int):
-    supabase = get_supabase()
-    supabase.schema("run").from_("optimization_run").update(
-        {
-            "status": "scrape_error",
-            "finished_at": datetime.utcnow().isoformat(),
-        }
-    ).eq("id", run_id).execute()
-
-
-# ============================================================
-# Save meta_json snapshot
-# ============================================================
-def set_meta_json(run_id: int, meta: dict):
-    supabase = get_supabase()
-    supabase.schema("run").from_("optimization_run").update(
-        {"meta_json": meta}
-    ).eq("id", run_id).execute()
+    get_schema("run").from_("optimization_run").update(patch).eq("id", run_id).execute()
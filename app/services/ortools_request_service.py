@@ -1,126 +1,94 @@
+import asyncio
 import logging
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Any
-from app.supabase import get_supabase
+from app.supabase import get_async_schema
 from app.services.time_matrix_service import build_time_matrix
 
 logger = logging.getLogger(__name__)
-supabase = get_supabase()
 
-def load_run(run_id: int) -> dict | None:
-    """Load optimization_run entry."""
-    run_q = (
-        supabase.schema("run")
+@lru_cache(maxsize=4096)
+def _to_epoch(ts: str) -> int:
+    """ISO timestamp → epoch seconds. Tasks share a few slot times, so each string is parsed once."""
+    return int(datetime.fromisoformat(ts).timestamp())
+
+async def load_run_with_tasks(run_id: int) -> tuple[dict | None, List[dict]]:
+    """Load the optimization_run entry and its routing tasks (embedded) in one request."""
+    run_q = await (
+        get_async_schema("run")
         .from_("optimization_run")
-        .select("*")
+        .select(
+            "*, routing_tasks(id, task_type, user_id, node_id, depot_id, "
+            "window_start, window_end, pair_key)"
+        )
         .eq("id", run_id)
+        .order("id", foreign_table="routing_tasks")
         .single()
         .execute()
     )
-    return run_q.data or None
+    run = run_q.data or None
+    if not run:
+        return None, []
+    return run, run.pop("routing_tasks", None) or []
 
-def load_tasks(run_id: int) -> List[dict]:
-    """Load routing tasks for this run."""
-    task_q = (
-        supabase.schema("run")
-        .from_("routing_tasks")
-        .select(
-            "id, task_type, user_id, node_id, depot_id, "
-            "window_start, window_end, pair_key"
-        )
-        .eq("run_id", run_id)
-        .order("id")
+async def load_depots_with_vehicles() -> Dict[int, dict]:
+    """Load all depots, each with its vehicles embedded, indexed by depot_id."""
+    depot_q = await (
+        get_async_schema("core")
+        .from_("depots")
+        .select("id, depot_name, depot_node_id, vehicles(id, vehicle_name, seats, depot_id, active)")
         .execute()
     )
-    return task_q.data or []
+    return {d["id"]: d for d in (depot_q.data or [])}
 
-def load_vehicles_for_facility(facility_name: str) -> List[dict]:
+def vehicles_for_facility(depot_map: Dict[int, dict], facility_name: str) -> List[dict]:
     """
-    Load vehicles that belong to the depot matching optimization_run.facility_name.
+    Active vehicles of the depot matching optimization_run.facility_name.
     facility_name == depots.depot_name
     """
-    depot_q = (
-        supabase.schema("core")
-        .from_("depots")
-        .select("id")
-        .eq("depot_name", facility_name)
-        .single()
-        .execute()
-    )
-
-    if not depot_q.data:
+    depot = next((d for d in depot_map.values() if d["depot_name"] == facility_name), None)
+    if not depot:
         logger.warning(
             f"[OR-Tools] No depot found for facility_name={facility_name}"
         )
         return []
+    return [v for v in depot.get("vehicles") or [] if v["active"]]
 
-    depot_id = depot_q.data["id"]
-
-    vehicle_q = (
-        supabase.schema("core")
-        .from_("vehicles")
-        .select("id, vehicle_name, seats, depot_id")
-        .eq("depot_id", depot_id)
-        .eq("active", True)
-        .execute()
-    )
-
-    return vehicle_q.data or []
-
-def load_depots() -> Dict[int, dict]:
-    """Load all depots indexed by depot_id."""
-    depot_q = (
-        supabase.schema("core")
-        .from_("depots")
-        .select("id, depot_name, depot_node_id")
-        .execute()
-    )
-    return {d["id"]: d for d in (depot_q.data or [])}
-
-def build_ortools_payload(run_id: int) -> Dict[str, Any]:
+async def build_ortools_payload(run_id: int) -> Dict[str, Any]:
     """
     Compile all data required to send to OR-Tools.
     Phase 6: Data aggregation & formatting only.
     """
     logger.info(f"[OR-Tools] Starting payload build for run_id={run_id}")
 
-    # Load optimization_run
-    run = load_run(run_id)
+    # Load optimization_run (tasks embedded) and depots (vehicles embedded) concurrently
+    (run, tasks), depot_map = await asyncio.gather(
+        load_run_with_tasks(run_id), load_depots_with_vehicles()
+    )
     if not run:
         return {"status": "error", "message": "run_id not found"}
 
     route_date = run.get("route_date")
     facility_name = run.get("facility_name")
 
-    # Load routing tasks
-    tasks = load_tasks(run_id)
     if not tasks:
         return {"status": "error", "message": "no routing tasks"}
 
-    # Load vehicles and depots
-    vehicles = load_vehicles_for_facility(facility_name)
-    depot_map = load_depots()
+    vehicles = vehicles_for_facility(depot_map, facility_name)
 
-    # Build time matrix
-    tm_result = build_time_matrix(run_id)
+    # Build time matrix (already NxN in node_ids order); still on the sync client
+    tm_result = await asyncio.to_thread(build_time_matrix, run_id, dense=True)
     if tm_result["status"] not in ["ok", "miss"]:
         return {"status": "error", "message": "time matrix unavailable"}
 
-    raw_matrix = tm_result["matrix"]
+    compressed_matrix: List[List[int]] = tm_result["matrix"]
     node_ids = tm_result["node_ids"]
     buckets = tm_result["buckets"]
 
     # Node ID → matrix index mapping
     node_index = {nid: idx for idx, nid in enumerate(node_ids)}
 
-    # Build compressed NxN matrix
-    compressed_matrix: List[List[int]] = []
-    for origin_id in node_ids:
-        row = []
-        for dest_id in node_ids:
-            row.append(raw_matrix[str(origin_id)][str(dest_id)])
-        compressed_matrix.append(row)
-
     # Format vehicles
     formatted_vehicles: List[dict] = []
     for v in vehicles:
@@ -161,12 +129,8 @@ def build_ortools_payload(run_id: int) -> Dict[str, Any]:
             )
             continue
 
-        window_start = int(
-            datetime.fromisoformat(t["window_start"]).timestamp()
-        )
-        window_end = int(
-            datetime.fromisoformat(t["window_end"]).timestamp()
-        )
+        window_start = _to_epoch(t["window_start"])
+        window_end = _to_epoch(t["window_end"])
 
         formatted_tasks.append({
             "task_id": t["id"],
@@ -180,8 +144,8 @@ def build_ortools_payload(run_id: int) -> Dict[str, Any]:
     payload = {
         "date": route_date,
         "facility_name": facility_name,
+        # Matrix row/column i is node_ids[i]; consumers rebuild node_index from it
         "node_ids": node_ids,
-        "node_index": node_index,
         "time_matrix": compressed_matrix,
         "buckets": buckets,
         "vehicles": formatted_vehicles,
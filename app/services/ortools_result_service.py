@@ -1,17 +1,39 @@
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any
-from app.supabase import get_supabase
+from app.supabase import get_schema
 from datetime import datetime, timezone
-import copy
+from functools import lru_cache
+from operator import itemgetter
 
 logger = logging.getLogger(__name__)
-supabase = get_supabase()
 
+# Keeps each request well under the PostgREST/Kong body limit (~1KB per row)
+RESULT_INSERT_BATCH_SIZE = int(os.getenv("RESULT_INSERT_BATCH_SIZE", "500"))
+# Chunks are I/O bound; gains flatten out past a few in flight
+RESULT_INSERT_CONCURRENCY = int(os.getenv("RESULT_INSERT_CONCURRENCY", "4"))
+
+_extract_stop = itemgetter("sequence", "event_type", "task_id", "arrival_at", "departure_at")
+
+# Stop fields already stored in their own routing_results columns
+_COLUMN_FIELDS = frozenset({
+    "sequence", "event_type", "arrival_at", "departure_at", "passengers", "task_id",
+})
+
+@lru_cache(maxsize=4096)
 def unix_to_utc(ts: int | None):
+    """Epoch seconds → UTC ISO string. Solver times repeat across stops, so each is formatted once."""
     if ts is None:
         return None
     return datetime.fromtimestamp(int(ts), tz=timezone.utc).isoformat()
 
+def _insert_chunk(rows: List[dict]) -> None:
+    get_schema("run").from_("routing_results").insert(rows).execute()
+
+def _delete_results(run_id: int) -> None:
+    get_schema("run").from_("routing_results").delete().eq("run_id", run_id).execute()
+
 def process_ortools_result(payload: Dict[str, Any]) -> Dict[str, Any]:
     run_id = payload.get("run_id")
     routes = payload.get("routes")
@@ -23,9 +45,11 @@ def process_ortools_result(payload: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     # Idempotency: clear existing results
-    supabase.schema("run").from_("routing_results").delete().eq("run_id", run_id).execute()
+    _delete_results(run_id)
 
+    # append is amortized O(1); binding it once saves the attribute lookup per stop
     insert_rows: List[dict] = []
+    add_row = insert_rows.append
 
     for route in routes:
         vehicle_id = route.get("vehicle_id")
@@ -36,11 +60,11 @@ def process_ortools_result(payload: Dict[str, Any]) -> Dict[str, Any]:
             continue
 
         for stop in stops:
-            sequence = stop.get("sequence")
-            event_type = stop.get("event_type")
-            task_id = stop.get("task_id")
-            arrival_at = stop.get("arrival_at")
-            departure_at = stop.get("departure_at")
+            try:
+                sequence, event_type, task_id, arrival_at, departure_at = _extract_stop(stop)
+            except KeyError:
+                logger.warning(f"Skipping invalid stop: {stop}")
+                continue
             passengers = stop.get("passengers", 0)
 
             if (
@@ -53,7 +77,9 @@ def process_ortools_result(payload: Dict[str, Any]) -> Dict[str, Any]:
                 logger.warning(f"Skipping invalid stop: {stop}")
                 continue
 
-            insert_rows.append({
+            meta = {k: v for k, v in stop.items() if k not in _COLUMN_FIELDS}
+
+            add_row({
                 "run_id": run_id,
                 "vehicle_id": vehicle_id,
                 "task_id": task_id,
@@ -62,7 +88,7 @@ def process_ortools_result(payload: Dict[str, Any]) -> Dict[str, Any]:
                 "departure_at": unix_to_utc(departure_at),
                 "passengers": passengers,
                 "event_type": event_type,
-                "meta_json": copy.deepcopy(stop)
+                "meta_json": meta or None
             })
 
     if not insert_rows:
@@ -71,8 +97,23 @@ def process_ortools_result(payload: Dict[str, Any]) -> Dict[str, Any]:
             "message": "No valid routing_results rows to insert"
         }
 
-    # Insert into routing_results
-    supabase.schema("run").from_("routing_results").insert(insert_rows).execute()
+    # Insert into routing_results in chunks, a few at a time
+    chunks = [
+        insert_rows[i:i + RESULT_INSERT_BATCH_SIZE]
+        for i in range(0, len(insert_rows), RESULT_INSERT_BATCH_SIZE)
+    ]
+    try:
+        if len(chunks) == 1:
+            _insert_chunk(chunks[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(RESULT_INSERT_CONCURRENCY, len(chunks))) as pool:
+                # list() re-raises the first failed chunk
+                list(pool.map(_insert_chunk, chunks))
+    except Exception:
+        # Chunks are separate requests: don't leave the run with a partial result set
+        logger.error(f"Inserting routing_results for run_id={run_id} failed; removing partial rows")
+        _delete_results(run_id)
+        raise
 
     logger.info(f"Inserted {len(insert_rows)} rows into run.routing_results")
 
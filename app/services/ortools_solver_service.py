@@ -1,9 +1,9 @@
+import gzip
 import logging
-import json
+import orjson
 import os
-import socket
-import urllib.request
-from urllib.error import URLError
+import requests
+from requests.adapters import HTTPAdapter
 from typing import Any, Dict, List, Tuple, Optional
 from collections import defaultdict
 from ortools.constraint_solver import pywrapcp, routing_enums_pb2
@@ -15,6 +15,12 @@ MAX_SOLVE_SECONDS = 30
 
 _DEFAULT_TIMEOUT = int(os.environ.get("MAKE_HTTP_TIMEOUT_SECONDS", "120"))
 _MAKE_WEBHOOK_URL = os.environ.get("MAKE_OR_TOOLS_RESULT_WEBHOOK")
+# Opt-in: only enable if the receiving webhook accepts Content-Encoding: gzip
+_MAKE_GZIP = os.environ.get("MAKE_WEBHOOK_GZIP", "").lower() in ("1", "true", "yes")
+
+# One pooled session per process, so repeated posts reuse the TLS connection
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 def _parse_tasks(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -149,6 +155,7 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
     - Time windows are applied per task-node (not per physical node).
     - Pickup/Delivery constraints are applied per pair_key using task-nodes.
     - passengers are computed manually from TASK order (PICK +1, DROP -1).
+    - Physical node ordering is payload.node_ids: matrix row/column i is node_ids[i].
     """
     time_matrix: List[List[int]] = payload.get("time_matrix") or []
     vehicles = payload.get("vehicles") or []
@@ -184,7 +191,8 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
         task_rnode_of_task_id[int(t["task_id"])] = rnode
         routing_to_phys.append(int(t["node_index"]))
 
-    task_id_of_rnode: Dict[int, int] = {rnode: task_id for task_id, rnode in task_rnode_of_task_id.items()}
+    # Per routing node (None at depots), so route extraction is plain list indexing
+    task_id_of_rnode: List[Optional[int]] = [None] * depot_count + [int(t["task_id"]) for t in tasks]
 
     total_nodes = depot_count + len(tasks)
 
@@ -197,22 +205,20 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
     routing = pywrapcp.RoutingModel(manager)
 
     # Cost / Transit
-    def time_cb(from_index: int, to_index: int) -> int:
-        frm = manager.IndexToNode(from_index)
-        to = manager.IndexToNode(to_index)
-        phys_from = routing_to_phys[int(frm)]
-        phys_to = routing_to_phys[int(to)]
-        return int(time_matrix[phys_from][phys_to])
-
-    transit_cb_index = routing.RegisterTransitCallback(time_cb)
+    # Expand the physical matrix into routing-node space and hand it to OR-Tools,
+    # so arcs are evaluated in C++ rather than through a Python callback
+    routing_matrix: List[List[int]] = [
+        [int(row[phys_to]) for phys_to in routing_to_phys]
+        for row in (time_matrix[phys_from] for phys_from in routing_to_phys)
+    ]
+    transit_cb_index = routing.RegisterTransitMatrix(routing_matrix)
     routing.SetArcCostEvaluatorOfAllVehicles(transit_cb_index)
 
     # Time dimension
-    rel_windows: Dict[int, Tuple[int, int]] = {
-        int(t["task_id"]): (int(t["window_start"] - base_time), int(t["window_end"] - base_time))
-        for t in tasks
-    }
-    latest_end = max(w[1] for w in rel_windows.values())
+    # Task-aligned columns (index i ↔ routing node depot_count + i), swept once each
+    rel_starts: List[int] = [t["window_start"] - base_time for t in tasks]
+    rel_ends: List[int] = [t["window_end"] - base_time for t in tasks]
+    latest_end = max(rel_ends)
     horizon = int(latest_end + 3600)  # 1h buffer after latest window end
 
     routing.AddDimension(
@@ -225,25 +231,15 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
     time_dim = routing.GetDimensionOrDie("Time")
 
     # Apply time windows PER TASK NODE (this is the key fix)
-    for t in tasks:
-        task_id = int(t["task_id"])
-        ws, we = rel_windows[task_id]
-        rnode = task_rnode_of_task_id[task_id]
-        ridx = manager.NodeToIndex(rnode)
-        time_dim.CumulVar(ridx).SetRange(int(ws), int(we))
+    for i, (ws, we) in enumerate(zip(rel_starts, rel_ends)):
+        ridx = manager.NodeToIndex(depot_count + i)
+        time_dim.CumulVar(ridx).SetRange(ws, we)
 
     # Capacity dimension (per TASK NODE)
     # Demand is 0 at depots, +/-1 at task nodes based on PICK/DROP.
-    task_by_rnode: Dict[int, Dict[str, Any]] = {task_rnode_of_task_id[int(t["task_id"])]: t for t in tasks}
-
-    def demand_cb(from_index: int) -> int:
-        rnode = manager.IndexToNode(from_index)
-        t = task_by_rnode.get(int(rnode))
-        if not t:
-            return 0
-        return _task_delta(t["task_type"])
-
-    demand_cb_index = routing.RegisterUnaryTransitCallback(demand_cb)
+    # Precomputed per routing node: task i is routing node depot_count + i
+    demand_of_rnode: List[int] = [0] * depot_count + [_task_delta(t["task_type"]) for t in tasks]
+    demand_cb_index = routing.RegisterUnaryTransitVector(demand_of_rnode)
     capacities = [int(v.get("capacity", 0)) for v in vehicles]
 
     routing.AddDimensionWithVehicleCapacity(
@@ -271,6 +267,8 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
     params.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION
     params.local_search_metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
     params.time_limit.FromSeconds(int(MAX_SOLVE_SECONDS))
+    # Let a multi-armed bandit pick which local search operators to apply
+    params.use_multi_armed_bandit_concatenate_operators = True
 
     solution = routing.SolveWithParameters(params)
     if solution is None:
@@ -279,8 +277,12 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
     # Build output
     routes_out: List[Dict[str, Any]] = []
 
-    # task_id -> task dict for output + passenger calc
-    tasks_by_id: Dict[int, Dict[str, Any]] = {int(t["task_id"]): t for t in tasks}
+    # Bound once: each call below crosses into C++, the attribute lookups need not repeat
+    index_to_node = manager.IndexToNode
+    value = solution.Value
+    next_var = routing.NextVar
+    cumul = time_dim.CumulVar
+    is_end = routing.IsEnd
 
     for v_i, v in enumerate(vehicles):
         vehicle_id = int(v["vehicle_id"])
@@ -292,9 +294,9 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
         task_ids_in_route: List[int] = []
 
         # DEPART anchor will use first TASK later
-        start_rnode = int(manager.IndexToNode(routing.Start(v_i)))
-        start_phys = int(routing_to_phys[start_rnode])
-        t0 = int(solution.Value(time_dim.CumulVar(routing.Start(v_i))))
+        index = routing.Start(v_i)
+        start_phys = int(routing_to_phys[index_to_node(index)])
+        t0 = int(value(cumul(index)))
 
         stops.append({
             "sequence": seq,
@@ -306,30 +308,26 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
             "passengers": int(current_passengers),
         })
 
-        index = routing.Start(v_i)
-
-        while not routing.IsEnd(index):
-            nxt = solution.Value(routing.NextVar(index))
-            if routing.IsEnd(nxt):
+        while not is_end(index):
+            nxt = value(next_var(index))
+            if is_end(nxt):
                 index = nxt
                 break
 
-            rnode = int(manager.IndexToNode(nxt))
+            rnode = index_to_node(nxt)
             if rnode >= depot_count:
                 seq += 1
-                tt = int(solution.Value(time_dim.CumulVar(nxt)))
+                tt = int(value(cumul(nxt)))
 
-                task_id = int(task_id_of_rnode[int(rnode)])
+                task_id = task_id_of_rnode[rnode]
                 task_ids_in_route.append(task_id)
-                task = tasks_by_id[task_id]
-
-                current_passengers += _task_delta(task["task_type"])
+                current_passengers += demand_of_rnode[rnode]
 
                 stops.append({
                     "sequence": seq,
                     "event_type": "TASK",
-                    "node_index": int(task["node_index"]),
-                    "task_id": int(task_id),
+                    "node_index": routing_to_phys[rnode],
+                    "task_id": task_id,
                     "arrival_at": int(base_time + tt),
                     "departure_at": int(base_time + tt),
                     "passengers": int(current_passengers),
@@ -347,9 +345,8 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
 
         # ARRIVE
         seq += 1
-        end_rnode = int(manager.IndexToNode(index))
-        end_phys = int(routing_to_phys[end_rnode])
-        te = int(solution.Value(time_dim.CumulVar(index)))
+        end_phys = int(routing_to_phys[index_to_node(index)])
+        te = int(value(cumul(index)))
 
         stops.append({
             "sequence": seq,
@@ -367,6 +364,7 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
             "stops": stops,
         })
 
+    node_ids = payload.get("node_ids") or []
     return {
         "status": "ok",
         "run_id": run_id,
@@ -374,8 +372,9 @@ def solve_ortools(payload: Dict[str, Any], run_id: Optional[int] = None) -> Dict
         "date": payload.get("date"),
         "base_time": int(base_time),
         "routes": routes_out,
-        "node_ids": payload.get("node_ids"),
-        "node_index": payload.get("node_index"),
+        "node_ids": node_ids,
+        # Not shipped in the payload; rebuilt from node_ids for result consumers
+        "node_index": {nid: i for i, nid in enumerate(node_ids)},
     }
 
 def post_solver_result_to_make(
@@ -388,21 +387,18 @@ def post_solver_result_to_make(
     if not _MAKE_WEBHOOK_URL:
         raise RuntimeError("MAKE_OR_TOOLS_RESULT_WEBHOOK is not set")
 
-    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-
-    req = urllib.request.Request(
-        _MAKE_WEBHOOK_URL,
-        data=body,
-        headers={"Content-Type": "application/json; charset=utf-8"},
-        method="POST",
-    )
+    # node_index has int keys; OPT_NON_STR_KEYS writes them as strings like json.dumps did
+    body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    headers = {"Content-Type": "application/json; charset=utf-8"}
+    if _MAKE_GZIP:
+        body = gzip.compress(body, compresslevel=1)
+        headers["Content-Encoding"] = "gzip"
 
     try:
-        with urllib.request.urlopen(req, timeout=timeout_sec) as resp:
-            status = resp.getcode()
-            text = resp.read().decode("utf-8")
-            logger.info(f"[OR-Tools] Posted solver result to Make (status={status})")
-            return status, text
-    except (socket.timeout, URLError) as e:
+        resp = _session.post(_MAKE_WEBHOOK_URL, data=body, headers=headers, timeout=timeout_sec)
+        resp.raise_for_status()
+        logger.info(f"[OR-Tools] Posted solver result to Make (status={resp.status_code})")
+        return resp.status_code, resp.text
+    except requests.RequestException as e:
         logger.error("[OR-Tools] Make webhook request failed", exc_info=e)
         raise TimeoutError("Make webhook request timed out") from e
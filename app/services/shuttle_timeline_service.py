@@ -1,14 +1,12 @@
 from typing import Dict, List
-from app.supabase import get_supabase
-
-supabase = get_supabase()
+from app.supabase import get_schema
 
 def load_shuttle_timelines(run_id: int) -> Dict[int, List[dict]]:
     """
     Reconstruct shuttle timeline per vehicle from routing_results
     """
     q = (
-        supabase.schema("run")
+        get_schema("run")
         .from_("routing_results")
         .select("*")
         .eq("run_id", run_id)
@@ -1,9 +1,8 @@
 import logging
 from datetime import datetime, timedelta, timezone
-from app.supabase import get_supabase
+from app.supabase import get_schema
 
 logger = logging.getLogger(__name__)
-supabase = get_supabase()
 
 def parse_time_jst_to_utc(target_time_str: str | None, date_base: datetime) -> datetime | None:
     """Convert target time like '09：30' JST → UTC datetime."""
@@ -25,7 +24,7 @@ def resolve_node_ids(depot_name: str, place: str):
     """Return node IDs for depot_name (kind=depot) and place (kind=place)."""
     depot_node_id, place_node_id = None, None
 
-    depot_query = (supabase.schema("core")
+    depot_query = (get_schema("core")
         .from_("nodes")
         .select("id")
         .eq("place", depot_name)
@@ -34,7 +33,7 @@ def resolve_node_ids(depot_name: str, place: str):
     if depot_query.data:
         depot_node_id = depot_query.data[0]["id"]
 
-    place_query = (supabase.schema("core")
+    place_query = (get_schema("core")
         .from_("nodes")
         .select("id")
         .eq("place", place)
@@ -49,7 +48,7 @@ def resolve_fk_ids(depot_name: str, user_name: str):
     """Return FK IDs for depot_name and user_name."""
     depot_id, user_id = None, None
 
-    depot_query = (supabase.schema("core")
+    depot_query = (get_schema("core")
         .from_("depots")
         .select("id")
         .eq("depot_name", depot_name)
@@ -57,7 +56,7 @@ def resolve_fk_ids(depot_name: str, user_name: str):
     if depot_query.data:
         depot_id = depot_query.data[0]["id"]
 
-    user_query = (supabase.schema("core")
+    user_query = (get_schema("core")
         .from_("users")
         .select("id")
         .eq("user_name", user_name)
@@ -73,7 +72,7 @@ def get_travel_minutes(origin_node_id: int, dest_node_id: int) -> int:
     Converts duration (seconds → minutes).
     """
     tt_query = (
-        supabase.schema("core")
+        get_schema("core")
         .from_("travel_times")
         .select("duration")
         .eq("origin_node_id", origin_node_id)
@@ -107,7 +106,7 @@ def split_and_create_tasks(run_id: int):
 
     # Load optimization_run entry
     run_query = (
-        supabase.schema("run")
+        get_schema("run")
         .from_("optimization_run")
         .select("meta_json")
         .eq("id", run_id)
@@ -157,7 +156,7 @@ def split_and_create_tasks(run_id: int):
 
     # Load existing task
     existing_query = (
-        supabase.schema("run")
+        get_schema("run")
         .from_("routing_tasks")
         .select("id, user_id, task_type")
         .eq("run_id", run_id)
@@ -281,11 +280,11 @@ def split_and_create_tasks(run_id: int):
 
     # Insert into routing_tasks
     if inserts:
-        supabase.schema("run").from_("routing_tasks").insert(inserts).execute()
+        get_schema("run").from_("routing_tasks").insert(inserts).execute()
         logger.info(f"Inserted {len(inserts)} new tasks into run.routing_tasks.")
 
     for task_id, row in updates:
-        supabase.schema("run").from_("routing_tasks").update(row).eq("id", task_id).execute()
+        get_schema("run").from_("routing_tasks").update(row).eq("id", task_id).execute()
 
     if updates:
         logger.info(f"Updated {len(updates)} existing tasks in run.routing_tasks.")
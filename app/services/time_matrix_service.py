@@ -1,10 +1,9 @@
 import logging
 from datetime import datetime, timedelta, timezone
-from app.supabase import get_supabase
+from app.supabase import get_schema
 from app.services.travel_time_service import build_and_store_matrix
 
 logger = logging.getLogger(__name__)
-supabase = get_supabase()
 
 def _parse_bucket(ts_str: str) -> int | None:
     """
@@ -26,7 +25,25 @@ def _parse_bucket(ts_str: str) -> int | None:
         logger.debug(f"[TimeMatrix] Failed to parse window_start '{ts_str}': {e}")
         return None
 
-def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
+def _dense_matrix(node_ids: list[int], data: list[dict]) -> list[list[int | None]]:
+    """
+    NxN list-of-lists in node_ids order: self-distance 0, missing pairs None.
+    Row/column i corresponds to node_ids[i].
+    """
+    index = {nid: i for i, nid in enumerate(node_ids)}
+    n = len(node_ids)
+    matrix: list[list[int | None]] = [[None] * n for _ in range(n)]
+    for row in data:
+        matrix[index[row["origin_node_id"]]][index[row["dest_node_id"]]] = row["duration"]
+    for i in range(n):
+        matrix[i][i] = 0
+    return matrix
+
+def _empty_matrix(dense: bool) -> list | dict:
+    """Matrix placeholder for non-ok results, of the same type an ok result would carry."""
+    return [] if dense else {}
+
+def build_time_matrix(run_id: int, profile: str = "driving", dense: bool = False) -> dict:
     """
     Build a filtered time matrix for selected nodes participating in a specific run.
 
@@ -35,12 +52,13 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
     2. Derive departure_buckets from window_start (hourly integer buckets).
     3. Fetch cached travel_times (core.travel_times) that match node pairs and buckets.
     4. If cache miss, rebuild via build_and_store_matrix() using the earliest bucket.
-    5. Return a structured matrix {origin_id: {dest_id: duration}}.
+    5. Return a structured matrix {origin_id: {dest_id: duration}},
+       or with dense=True an NxN list-of-lists indexed like node_ids.
     """
     try:
         # Load optimization_run entry
         run_query = (
-            supabase.schema("run")
+            get_schema("run")
             .from_("optimization_run")
             .select("meta_json, route_date")
             .eq("id", run_id)
@@ -52,7 +70,7 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
             return {
                 "status": "error",
                 "message": f"run_id={run_id} not found",
-                "matrix": {},
+                "matrix": _empty_matrix(dense),
                 "node_ids": [],
                 "buckets": [],
             }
@@ -65,7 +83,7 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
             return {
                 "status": "error",
                 "message": "Route date does not match today; matrix build skipped.",
-                "matrix": {},
+                "matrix": _empty_matrix(dense),
                 "node_ids": [],
                 "buckets": [],
                 "route_date": route_date,
@@ -73,7 +91,7 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
         
         # Retrieve routing_tasks for this run
         task_query = (
-            supabase.schema("run")
+            get_schema("run")
             .from_("routing_tasks")
             .select("node_id, window_start")
             .eq("run_id", run_id)
@@ -84,7 +102,7 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
             logger.warning(f"[TimeMatrix] No routing_tasks found for run_id={run_id}")
             return {
                 "status": "empty",
-                "matrix": {},
+                "matrix": _empty_matrix(dense),
                 "node_ids": [],
                 "buckets": []
             }
@@ -103,7 +121,7 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
             logger.warning(f"[TimeMatrix] No valid node IDs for run_id={run_id}")
             return {
                 "status": "empty",
-                "matrix": {},
+                "matrix": _empty_matrix(dense),
                 "node_ids": [],
                 "buckets": [],
                 "route_date": route_date,
@@ -113,7 +131,7 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
             logger.warning(f"[TimeMatrix] No valid departure buckets for run_id={run_id}")
             return {
                 "status": "empty",
-                "matrix": {},
+                "matrix": _empty_matrix(dense),
                 "node_ids": list(nodes),
                 "buckets": [],
                 "route_date": route_date,
@@ -126,7 +144,7 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
 
         # Query cached travel_times
         tt_query = (
-            supabase.schema("core")
+            get_schema("core")
             .from_("travel_times")
             .select("origin_node_id, dest_node_id, duration, departure_bucket, profile")
             .in_("origin_node_id", list(nodes))
@@ -147,7 +165,7 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
 
             # Retrieve node info for rebuild
             node_query = (
-                supabase.schema("core")
+                get_schema("core")
                 .from_("nodes")
                 .select("id, address, latitude, longitude")
                 .in_("id", list(nodes))
@@ -162,7 +180,7 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
                 return {
                     "status": "error",
                     "message": "no nodes available for rebuild",
-                    "matrix": {},
+                    "matrix": _empty_matrix(dense),
                     "node_ids": sorted(list(nodes)),
                     "buckets": sorted(list(buckets)),
                     "route_date": route_date,
@@ -178,7 +196,7 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
 
             # Requery after rebuild
             tt_query = (
-                supabase.schema("core")
+                get_schema("core")
                 .from_("travel_times")
                 .select("origin_node_id, dest_node_id, duration, departure_bucket, profile")
                 .in_("origin_node_id", list(nodes))
@@ -194,12 +212,23 @@ def build_time_matrix(run_id: int, profile: str = "driving") -> dict:
                 return {
                     "status": "miss",
                     "message": "no travel_times even after rebuild",
-                    "matrix": {},
+                    "matrix": _empty_matrix(dense),
                     "node_ids": sorted(list(nodes)),
                     "buckets": sorted(list(buckets)),
                     "route_date": route_date,
                 }
 
+        if dense:
+            node_ids = sorted(nodes)
+            logger.info(f"[TimeMatrix] Built dense matrix for run_id={run_id}")
+            return {
+                "status": "ok",
+                "matrix": _dense_matrix(node_ids, data),
+                "node_ids": node_ids,
+                "buckets": sorted(list(buckets)),
+                "route_date": route_date,
+            }
+
         # Build structured matrix
         matrix = {str(o): {} for o in nodes}
         
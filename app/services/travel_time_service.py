@@ -1,10 +1,9 @@
 import logging
 from datetime import datetime, timezone
-from app.supabase import get_supabase
+from app.supabase import get_schema
 from app.utils.routes_matrix_helper import build_matrix
 
 logger = logging.getLogger(__name__)
-supabase = get_supabase()
 
 def build_and_store_matrix(
     nodes: list[dict],
@@ -78,7 +77,7 @@ def build_and_store_matrix(
 
     # Upsert into core.travel_times
     if rows:
-        supabase.schema("core").from_("travel_times").upsert(rows).execute()
+        get_schema("core").from_("travel_times").upsert(rows).execute()
         logger.info(f"[TravelTime] Upserted {len(rows)} records into core.travel_times")
 
     return {
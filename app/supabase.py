@@ -1,19 +1,49 @@
 import os
+import httpx
 from functools import lru_cache
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from postgrest import SyncPostgrestClient, AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
 from pathlib import Path
 
 # ✅ Always load .env from the project root
 env_path = Path(__file__).resolve().parents[1] / ".env"
 load_dotenv(dotenv_path=env_path)
 
-@lru_cache(maxsize=1)
-def get_supabase() -> Client:
+# Keep connections to PostgREST warm between the many small per-run calls;
+# HTTP/2 multiplexes concurrent requests over one connection
+SUPABASE_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60)
+# Matches postgrest's own default; a bare httpx client would time out after 5 s
+SUPABASE_HTTP_TIMEOUT = 120
+
+def _get_credentials() -> tuple[str, str]:
     url = os.environ.get("SUPABASE_URL")
     key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("SUPABASE_ANON_KEY")
     if url is None:
         raise RuntimeError("Environment variable SUPABASE_URL is not set.")
     if key is None:
         raise RuntimeError("Neither SUPABASE_SERVICE_ROLE_KEY nor SUPABASE_ANON_KEY is set.")
-    return create_client(url, key)
+    return url, key
+
+def _rest_args() -> tuple[str, dict]:
+    url, key = _get_credentials()
+    headers = {**DEFAULT_POSTGREST_CLIENT_HEADERS, "apikey": key, "Authorization": f"Bearer {key}"}
+    return f"{url}/rest/v1", headers
+
+# supabase-py's Client.schema() builds a fresh PostgREST client (and connection pool) on
+# every call, so queries go through these cached per-schema clients instead. Each schema
+# gets its own pooled httpx client: postgrest writes the schema's profile headers onto the
+# session it is given, so one session can't be shared across schemas.
+@lru_cache(maxsize=None)
+def get_schema(schema: str) -> SyncPostgrestClient:
+    """Return a cached PostgREST client for `schema` (run / core / stg ...)."""
+    base_url, headers = _rest_args()
+    http_client = httpx.Client(limits=SUPABASE_HTTP_LIMITS, timeout=SUPABASE_HTTP_TIMEOUT, http2=True)
+    return SyncPostgrestClient(base_url, schema=schema, headers=headers, http_client=http_client)
+
+@lru_cache(maxsize=None)
+def get_async_schema(schema: str) -> AsyncPostgrestClient:
+    """Return a cached async PostgREST client for `schema`, for use inside async route handlers."""
+    base_url, headers = _rest_args()
+    http_client = httpx.AsyncClient(limits=SUPABASE_HTTP_LIMITS, timeout=SUPABASE_HTTP_TIMEOUT, http2=True)
+    return AsyncPostgrestClient(base_url, schema=schema, headers=headers, http_client=http_client)
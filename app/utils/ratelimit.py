@@ -0,0 +1,19 @@
+import os
+from aiolimiter import AsyncLimiter
+
+# Notion allows an average of 3 requests/second per integration token
+NOTION_LIMITER = AsyncLimiter(int(os.getenv("NOTION_MAX_RPS", "3")), 1.0)
+
+# PostgREST has no hard quota; this only smooths bursts from fan-out
+SUPABASE_LIMITER = AsyncLimiter(int(os.getenv("SUPABASE_MAX_RPS", "20")), 1.0)
+
+MAX_BACKOFF_SECONDS = 30.0
+
+def backoff_delay(retry_after: str | None, attempt: int) -> float:
+    """Seconds to wait before retrying a 429: honor Retry-After, else exponential backoff."""
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        except ValueError:
+            pass
+    return min(2 ** attempt, MAX_BACKOFF_SECONDS)
@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# In-process TTL cache for idempotent, read-heavy endpoints keyed by run_id.
+# Mutating endpoints drop the affected namespaces so reads never go stale.
+DEFAULT_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+# Entries hold full payloads (NxN matrices); cap how many a worker keeps
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+
+SHUTTLE_TIMELINE = "shuttle_timeline"
+ORTOOLS_PAYLOAD = "ortools_payload"
+TIME_MATRIX = "time_matrix"
+# Single-flight only: solves are never cached
+ORTOOLS_SOLVE = "ortools_solve"
+
+_store: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+# Bumped by every drop in a namespace; a load that started before a drop must not store
+_generations: Dict[str, int] = {}
+# Sync handlers hit the cache from the threadpool, async ones from the event loop
+_lock = threading.Lock()
+
+def cache_generation(namespace: str) -> int:
+    """Take before loading a value; pass to set_cached so a drop during the load wins."""
+    with _lock:
+        return _generations.get(namespace, 0)
+
+def get_cached(namespace: str, key: Hashable) -> Optional[Any]:
+    with _lock:
+        entry = _store.get((namespace, key))
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            _store.pop((namespace, key), None)
+            return None
+        return value
+
+def set_cached(
+    namespace: str,
+    key: Hashable,
+    value: Any,
+    ttl: int = DEFAULT_TTL_SECONDS,
+    generation: Optional[int] = None,
+) -> None:
+    with _lock:
+        if generation is not None and generation != _generations.get(namespace, 0):
+            return  # dropped while this value was loading; it may be stale
+        now = time.monotonic()
+        # Sweep expired entries so run_ids that are never read again don't pile up
+        for k in [k for k, (expires_at, _) in _store.items() if expires_at < now]:
+            del _store[k]
+        _store.pop((namespace, key), None)
+        # Still full: evict the oldest inserts (dicts keep insertion order)
+        while len(_store) >= MAX_ENTRIES:
+            del _store[next(iter(_store))]
+        _store[(namespace, key)] = (now + ttl, value)
+
+def drop_cached(*namespaces: str, key: Optional[Hashable] = None) -> None:
+    """Drop cached entries in the given namespaces (all keys unless `key` is given)."""
+    with _lock:
+        for ns in namespaces:
+            _generations[ns] = _generations.get(ns, 0) + 1
+        for ns, k in list(_store):
+            if ns in namespaces and (key is None or k == key):
+                _store.pop((ns, k), None)
@@ -0,0 +1,12 @@
+import orjson
+from fastapi.responses import JSONResponse
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    Stands in for FastAPI's ORJSONResponse, which newer FastAPI releases deprecate.
+    """
+
+    def render(self, content) -> bytes:
+        # Non-str keys (e.g. int node ids) are written as strings, as json.dumps would
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -2,6 +2,7 @@ import json
 import hashlib
 import requests
 import os
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional, Iterable
 from fastapi import HTTPException
 from dotenv import load_dotenv
@@ -11,7 +12,8 @@ load_dotenv()
 MAX_BLOCK = 100
 _cache: Dict[str, Dict] = {}
 
-# API Key
+# API Key (cached once set; a missing key is re-checked on each call)
+@lru_cache(maxsize=1)
 def _get_key() -> str:
     key = os.getenv("MAPS_API_KEY", "").strip()
     if not key:
@@ -0,0 +1,19 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+# (namespace, key) → task currently computing that result
+_inflight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+
+async def single_flight(namespace: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run `fn` once per (namespace, key) at a time.
+    Concurrent callers for the same key await the in-flight result instead of redoing the work.
+    """
+    k = (namespace, key)
+    task = _inflight.get(k)
+    if task is None:
+        task = asyncio.ensure_future(fn())
+        _inflight[k] = task
+        task.add_done_callback(lambda _: _inflight.pop(k, None))
+    # shield: one caller disconnecting must not cancel the work for the others
+    return await asyncio.shield(task)
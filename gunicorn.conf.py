@@ -0,0 +1,14 @@
+import os
+
+# ==========================================
+# Production launcher: gunicorn -c gunicorn.conf.py app.main:app
+# ==========================================
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# One worker by default. The response cache, single-flight, Notion/Supabase rate
+# limiters, scrape concurrency and the shared Chromium instance are all per process:
+# extra workers serve stale cached reads after writes and multiply the external rate
+# limits. Only raise GUNICORN_WORKERS once that state lives in shared storage.
+workers = int(os.getenv("GUNICORN_WORKERS", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"  # picks up uvloop + httptools when installed
+keepalive = 5
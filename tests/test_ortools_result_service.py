@@ -0,0 +1,54 @@
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("postgrest")
+
+from app.services import ortools_result_service as svc  # noqa: E402
+
+
+def _payload(n_stops: int) -> dict:
+    return {
+        "run_id": 42,
+        "routes": [{
+            "vehicle_id": 1,
+            "stops": [
+                {
+                    "sequence": i,
+                    "event_type": "TASK",
+                    "task_id": 100 + i,
+                    "arrival_at": 1_700_000_000 + i * 60,
+                    "departure_at": 1_700_000_000 + i * 60,
+                }
+                for i in range(n_stops)
+            ],
+        }],
+    }
+
+
+def test_failed_chunk_removes_partial_results(monkeypatch):
+    monkeypatch.setattr(svc, "RESULT_INSERT_BATCH_SIZE", 1)
+
+    def insert_chunk(rows):
+        if rows[0]["sequence"] == 1:
+            raise RuntimeError("chunk failed")
+
+    with mock.patch.object(svc, "_insert_chunk", side_effect=insert_chunk), \
+         mock.patch.object(svc, "_delete_results") as delete_results:
+        with pytest.raises(RuntimeError, match="chunk failed"):
+            svc.process_ortools_result(_payload(3))
+
+    # Once for idempotency before inserting, once to clean up after the failure
+    assert delete_results.call_args_list == [mock.call(42), mock.call(42)]
+
+
+def test_successful_insert_keeps_results(monkeypatch):
+    monkeypatch.setattr(svc, "RESULT_INSERT_BATCH_SIZE", 1)
+
+    with mock.patch.object(svc, "_insert_chunk") as insert_chunk, \
+         mock.patch.object(svc, "_delete_results") as delete_results:
+        result = svc.process_ortools_result(_payload(3))
+
+    assert result == {"status": "ok", "inserted": 3}
+    assert insert_chunk.call_count == 3
+    delete_results.assert_called_once_with(42)